@@ -0,0 +1,179 @@
+"""
+Batch scoring of many families.
+
+Reads families from a directory of `load_data` CSV files or from a JSONL
+stream, and writes one JSON line of marginals per family. Families are
+handed to a pool of workers from the most to the least expensive, so the
+largest ones do not hold up the end of the batch. Families too large for
+exact enumeration, or whose enumeration runs past a timeout, fall back to
+Gibbs sampling.
+
+Each line of a JSONL input holds one family, for example
+    {"family": "potter", "people": [
+        {"name": "Harry", "mother": "Lily", "father": "James", "trait": null},
+        {"name": "James", "mother": null, "father": null, "trait": 1},
+        {"name": "Lily", "mother": null, "father": null, "trait": 0}]}
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from heredity import enumerate_probabilities, load_data, load_rows
+from sampling import gibbs_sampling
+
+# Largest number of joint probabilities to compute by exact enumeration
+EXACT_BUDGET = 200000
+
+# Seconds an exact enumeration may run before falling back to sampling
+EXACT_TIMEOUT = 10
+
+# Number of samples drawn when falling back to sampling
+FALLBACK_SAMPLES = 10000
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4]:
+        sys.exit("Usage: python batch.py (directory|families.jsonl|-) "
+                 "[output.jsonl] [workers]")
+    families = read_families(sys.argv[1])
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else os.cpu_count()
+
+    start = time.perf_counter()
+    if len(sys.argv) >= 3 and sys.argv[2] != "-":
+        with open(sys.argv[2], "w") as output:
+            counts = score_families(families, output, workers)
+    else:
+        counts = score_families(families, sys.stdout, workers)
+    elapsed = time.perf_counter() - start
+
+    summary = ", ".join(f"{count} {engine}" for engine, count in counts.items())
+    print(f"Scored {len(families)} families in {elapsed:.2f}s ({summary})",
+          file=sys.stderr)
+
+
+def read_families(source):
+    """
+    Return a list of `(family, people)` pairs read from `source`: a
+    directory of CSV files, a JSONL file, or "-" for JSONL on stdin.
+    """
+    if os.path.isdir(source):
+        return [
+            (os.path.splitext(filename)[0],
+             load_data(os.path.join(source, filename)))
+            for filename in sorted(os.listdir(source))
+            if filename.endswith(".csv")
+        ]
+
+    stream = sys.stdin if source == "-" else open(source)
+    try:
+        families = []
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            family = record.get("family", str(number))
+            families.append((family, load_rows(
+                json_row(person) for person in record["people"]
+            )))
+        return families
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def json_row(person):
+    """
+    Convert a person from a JSONL record into a `load_data` CSV row.
+    """
+    trait = person.get("trait")
+    return {
+        "name": person["name"],
+        "mother": person.get("mother") or "",
+        "father": person.get("father") or "",
+        "trait": "" if trait is None else "1" if trait else "0"
+    }
+
+
+def exact_cost(people):
+    """
+    Return the number of joint probabilities exact enumeration computes for
+    `people`: three gene counts per person, two traits per unknown trait.
+    """
+    unknown = sum(1 for person in people.values() if person["trait"] is None)
+    return 3 ** len(people) * 2 ** unknown
+
+
+def estimated_cost(people):
+    """
+    Return a rough estimate of the work to score `people`, in person
+    updates, with whichever engine `score_family` will pick first.
+    """
+    cost = exact_cost(people)
+    if cost <= EXACT_BUDGET:
+        return cost * len(people)
+    return FALLBACK_SAMPLES * len(people)
+
+
+def score_families(families, output, workers):
+    """
+    Score `families` on `workers` processes, starting with the most
+    expensive, and write one JSON line per family to `output` as soon as it
+    is done. Return a dictionary counting the families per engine.
+    """
+    order = sorted(families, key=lambda f: estimated_cost(f[1]), reverse=True)
+    counts = dict()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(score_family, family, people)
+            for family, people in order
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            counts[record["engine"]] = counts.get(record["engine"], 0) + 1
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+    return counts
+
+
+def score_family(family, people, budget=EXACT_BUDGET, timeout=EXACT_TIMEOUT):
+    """
+    Return a JSON-serializable record with the marginals of `people`.
+
+    Use exact enumeration if it needs at most `budget` joint probabilities
+    and finishes within `timeout` seconds, Gibbs sampling otherwise.
+    """
+    start = time.perf_counter()
+    record = {"family": family, "people": len(people)}
+    try:
+        if exact_cost(people) > budget:
+            record["fallback"] = "size"
+        else:
+            try:
+                deadline = time.monotonic() + timeout
+                probabilities = enumerate_probabilities(
+                    people, deadline=deadline
+                )
+                record["engine"] = "exact"
+            except TimeoutError:
+                record["fallback"] = "timeout"
+
+        if "fallback" in record:
+            probabilities, diagnostics = gibbs_sampling(
+                people, samples=FALLBACK_SAMPLES
+            )
+            record["engine"] = "gibbs"
+            record["ess"] = diagnostics["ess"]
+            record["rhat"] = diagnostics["rhat"]
+        record["marginals"] = probabilities
+    except Exception as e:
+        record["engine"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = time.perf_counter() - start
+    return record
+
+
+if __name__ == "__main__":
+    main()
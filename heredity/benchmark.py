@@ -0,0 +1,126 @@
+"""
+Time every heredity inference engine on synthetic families of growing size,
+and check that the engines agree with one another.
+
+Exact engines must agree to within `EXACT_TOLERANCE`, and the runner fails
+if they do not. Sampling engines are flagged as inaccurate when they are
+further than `SAMPLING_TOLERANCE` from the exact answer, which shows where
+their default number of samples stops being enough. Engines are skipped on
+families larger than their limit, beyond which they take too long, and
+reported as skipped when they cannot handle a particular family, such as
+the session on a family whose junction tree needs too large a clique.
+"""
+
+import os
+import sys
+import time
+
+import graycode
+import heredity
+import sampling
+import session
+import synthetic
+
+SIZES = [3, 5, 7, 8, 10, 50, 200, 1000]
+DEPTH = 4
+EVIDENCE = 0.5
+
+EXACT_TOLERANCE = 1e-9
+SAMPLING_TOLERANCE = 0.05
+
+
+def session_probabilities(people):
+    """
+    Return the marginals of an `InferenceSession` of `people`, or None if
+    the family needs a clique larger than `session.MAX_CLIQUE`.
+    """
+    try:
+        inference = session.InferenceSession(people)
+    except session.CliqueTooLarge:
+        return None
+    return inference.marginals()
+
+
+# Each engine as (name, function of people, exact, largest family size),
+# where the function returns None for a family it cannot handle
+ENGINES = [
+    ("enumerate", heredity.enumerate_probabilities, True, 8),
+    ("sharded", lambda people: heredity.enumerate_probabilities(
+        people, workers=os.cpu_count()), True, 8),
+    ("graycode", graycode.gray_code_probabilities, True, 10),
+    ("session", session_probabilities, True, 5000),
+    ("likelihood weighting",
+     lambda people: sampling.likelihood_weighting(people)[0], False, 5000),
+    ("gibbs", lambda people: sampling.gibbs_sampling(people)[0], False, 5000)
+]
+
+
+def main():
+    if len(sys.argv) > 1:
+        sizes = [int(size) for size in sys.argv[1:]]
+    else:
+        sizes = SIZES
+
+    print(f"{'people':>6}  {'engine':<20} {'seconds':>9}  {'max diff':>9}")
+    failures = 0
+    for size in sizes:
+        people = synthetic.generate_family(size, DEPTH, EVIDENCE, seed=size)
+        for engine, seconds, difference, status in benchmark(people):
+            diff = "-" if difference is None else f"{difference:.2e}"
+            flag = "" if status == "ok" else f"  {status}"
+            print(f"{size:>6}  {engine:<20} {seconds:>9.4f}  {diff:>9}{flag}")
+            failures += status == "DISAGREES"
+    if failures:
+        sys.exit(f"{failures} exact engine results disagree")
+
+
+def benchmark(people, engines=ENGINES):
+    """
+    Run every engine in `engines` that accepts a family the size of
+    `people`, returning a list of `(engine, seconds, difference, status)`.
+
+    `difference` is the largest absolute difference from the first exact
+    engine's probabilities, or None for that engine itself. `status` is
+    "ok", "DISAGREES" for an exact engine or "inaccurate" for a sampling
+    engine outside its tolerance, or "skipped" for an engine that could
+    not handle `people`.
+    """
+    results = []
+    reference = None
+    for name, engine, exact, limit in engines:
+        if len(people) > limit:
+            continue
+        start = time.perf_counter()
+        probabilities = engine(people)
+        seconds = time.perf_counter() - start
+
+        if probabilities is None:
+            results.append((name, seconds, None, "skipped"))
+            continue
+        if reference is None:
+            if exact:
+                reference = probabilities
+            results.append((name, seconds, None, "ok"))
+            continue
+        difference = max_difference(reference, probabilities)
+        if exact:
+            status = "ok" if difference <= EXACT_TOLERANCE else "DISAGREES"
+        else:
+            status = "ok" if difference <= SAMPLING_TOLERANCE else "inaccurate"
+        results.append((name, seconds, difference, status))
+    return results
+
+
+def max_difference(a, b):
+    """
+    Return the largest absolute difference between two sets of
+    probabilities for the same people.
+    """
+    return max(
+        abs(a[person][field][value] - b[person][field][value])
+        for person in a for field in a[person] for value in a[person][field]
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Exact enumeration in Gray code order with incremental joint probabilities.
+
+`heredity.py` computes the joint probability of every assignment of genes
+and traits from scratch. Here assignments are visited in reflected
+mixed-radix Gray code order, so that consecutive assignments differ in the
+state of a single person. Each person's factor is the log probability of
+their gene count given their parents and of their trait given their gene
+count, so a step only recomputes the factors of the changed person and,
+if their gene count changed, of their children.
+"""
+
+import math
+import sys
+import time
+
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+# States of a person whose trait is unknown, as (genes, trait) pairs.
+# Consecutive states differ in either the gene count or the trait.
+UNKNOWN_TRAIT_STATES = (
+    (0, False), (0, True), (1, True), (1, False), (2, False), (2, True)
+)
+
+# Number of steps between exact recomputations of the running log joint
+RESYNC_STEPS = 4096
+
+# Log joint headroom above the current scale before rescaling the sums
+RESCALE_MARGIN = 64.0
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python graycode.py data.csv")
+    people = load_data(sys.argv[1])
+    start = time.perf_counter()
+    probabilities = gray_code_probabilities(people)
+    elapsed = time.perf_counter() - start
+    print_probabilities(probabilities)
+    print(f"Enumerated in {elapsed:.3f}s")
+
+
+def gray_code(radices):
+    """
+    Generate the reflected mixed-radix Gray code over digits with the given
+    `radices`, starting from all zeros (Knuth, TAOCP 7.2.1.1, Algorithm H).
+
+    For each step after the first assignment, yield `(j, digit)`: the
+    position that changed and its new value.
+    """
+    n = len(radices)
+    digits = [0] * n
+    directions = [1] * n
+    focus = list(range(n + 1))
+    while True:
+        j = focus[0]
+        focus[0] = 0
+        if j == n:
+            return
+        digits[j] += directions[j]
+        if digits[j] == 0 or digits[j] == radices[j] - 1:
+            directions[j] = -directions[j]
+            focus[j] = focus[j + 1]
+            focus[j + 1] = j + 1
+        yield j, digits[j]
+
+
+def log(p):
+    return math.log(p) if p > 0 else None
+
+
+def gray_code_probabilities(people, probs=PROBS):
+    """
+    Return the gene and trait distribution of everyone in `people`, the
+    same as exact enumeration in `heredity.py`, visiting the assignments in
+    Gray code order and updating the joint probability incrementally.
+
+    The joint probability is kept as a sum of per-person log factors, and
+    the accumulated sums are scaled relative to the largest log joint seen
+    so far, so large families do not underflow. Factors of probability
+    zero are counted rather than added, since they have no logarithm.
+    """
+    pedigree = Pedigree(people, probs)
+    n = len(pedigree)
+    log_prior = [log(p) for p in pedigree.gene_prior]
+    log_inherit = [[[log(p) for p in row] for row in table]
+                   for table in pedigree.inherit]
+    log_trait = [[log(p) for p in row] for row in pedigree.trait_given_gene]
+
+    # Every person's possible states, starting from the first Gray code digit
+    states = [
+        UNKNOWN_TRAIT_STATES if pedigree.evidence[i] is None
+        else tuple((g, pedigree.evidence[i]) for g in range(3))
+        for i in range(n)
+    ]
+    digits = [0] * n
+    genes = [states[i][0][0] for i in range(n)]
+    traits = [states[i][0][1] for i in range(n)]
+
+    def factor(i):
+        if pedigree.mother[i] is None:
+            p = log_prior[genes[i]]
+        else:
+            p = log_inherit[genes[pedigree.mother[i]]][genes[pedigree.father[i]]][genes[i]]
+        q = log_trait[genes[i]][traits[i]]
+        if p is None or q is None:
+            return None
+        return p + q
+
+    factors = [factor(i) for i in range(n)]
+    zeros = sum(1 for f in factors if f is None)
+    total = math.fsum(f for f in factors if f is not None)
+    scale = total
+
+    # `weight` is the running sum of joint probabilities, relative to
+    # `scale`. Each person's sums are only brought up to date when they
+    # change state: `entered[i]` is the running sum when person `i`
+    # entered their current state.
+    weight = 0.0
+    entered = [0.0] * n
+    sums = [[0.0] * len(states[i]) for i in range(n)]
+
+    def set_factor(i, value):
+        nonlocal zeros, total
+        old = factors[i]
+        if old is None:
+            zeros -= 1
+        else:
+            total -= old
+        if value is None:
+            zeros += 1
+        else:
+            total += value
+        factors[i] = value
+
+    steps = 0
+    codes = gray_code([len(s) for s in states])
+    while True:
+
+        # Add the joint probability of the current assignment
+        if not zeros:
+            if total > scale + RESCALE_MARGIN:
+                rescale = math.exp(scale - total)
+                weight *= rescale
+                for i in range(n):
+                    entered[i] *= rescale
+                    sums[i] = [s * rescale for s in sums[i]]
+                scale = total
+            weight += math.exp(total - scale)
+
+        # Move to the next assignment
+        step = next(codes, None)
+        if step is None:
+            break
+        j, digit = step
+        sums[j][digits[j]] += weight - entered[j]
+        entered[j] = weight
+        digits[j] = digit
+        new_genes, new_trait = states[j][digit]
+        traits[j] = new_trait
+        if new_genes != genes[j]:
+            genes[j] = new_genes
+            set_factor(j, factor(j))
+            for child in pedigree.children[j]:
+                set_factor(child, factor(child))
+        else:
+            set_factor(j, factor(j))
+
+        # Recompute the running total now and then to bound rounding drift
+        steps += 1
+        if steps % RESYNC_STEPS == 0:
+            total = math.fsum(f for f in factors if f is not None)
+
+    # Bring everyone's sums up to date and normalize
+    if weight == 0:
+        raise ValueError("evidence has zero probability under the model")
+    gene_marginals = []
+    trait_marginals = []
+    for i in range(n):
+        sums[i][digits[i]] += weight - entered[i]
+        gene = [0.0, 0.0, 0.0]
+        trait = 0.0
+        for (g, t), s in zip(states[i], sums[i]):
+            gene[g] += s / weight
+            if t:
+                trait += s / weight
+        gene_marginals.append(gene)
+        trait_marginals.append(trait)
+    return pedigree.probabilities(gene_marginals, trait_marginals)
+
+
+if __name__ == "__main__":
+    main()
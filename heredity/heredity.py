@@ -1,6 +1,8 @@
 import csv
 import itertools
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 PROBS = {
 
@@ -36,32 +38,87 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Number of (have_trait, one_gene) pairs enumerated by each shard
+SHARD_SIZE = 64
+
 
 def main():
 
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python heredity.py data.csv [workers]")
     people = load_data(sys.argv[1])
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else 1
 
-    # Keep track of gene and trait probabilities for each person
-    probabilities = {
-        person: {
-            "gene": {
-                2: 0,
-                1: 0,
-                0: 0
-            },
-            "trait": {
-                True: 0,
-                False: 0
-            }
-        }
-        for person in people
-    }
+    # Compute gene and trait probabilities for each person
+    start = time.perf_counter()
+    probabilities = enumerate_probabilities(people, workers)
+    elapsed = time.perf_counter() - start
+
+    # Print results
+    print_probabilities(probabilities)
+
+    # Report speedup over a single worker
+    if workers > 1:
+        start = time.perf_counter()
+        serial = enumerate_probabilities(people)
+        serial_elapsed = time.perf_counter() - start
+        identical = "identical" if serial == probabilities else "DIFFERENT"
+        print(f"{workers} workers: {elapsed:.3f}s, "
+              f"1 worker: {serial_elapsed:.3f}s, "
+              f"speedup {serial_elapsed / elapsed:.2f}x ({identical} results)")
+
+
+def enumerate_probabilities(people, workers=1, shard_size=SHARD_SIZE,
+                            deadline=None):
+    """
+    Return the gene and trait distribution of everyone in `people`,
+    computed by exact enumeration of all gene and trait assignments.
+
+    The enumeration is split into shards of `shard_size` pairs of
+    `have_trait` and `one_gene` sets, which are run on `workers` processes.
+    Shards are formed and merged in a fixed order, so the result is
+    bitwise identical for any number of workers.
+
+    If `deadline`, a `time.monotonic()` value, passes before the
+    enumeration is done, raise TimeoutError.
+    """
+    shards = list(enumeration_shards(people, shard_size))
+    if workers > 1 and len(shards) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(
+                enumerate_shard, itertools.repeat(people), shards,
+                itertools.repeat(deadline),
+                chunksize=max(1, len(shards) // (4 * workers))
+            ))
+    else:
+        partials = [
+            enumerate_shard(people, shard, deadline) for shard in shards
+        ]
+
+    # Merge partial probabilities in shard order
+    probabilities = initial_probabilities(people)
+    for partial in partials:
+        for person in probabilities:
+            for field in probabilities[person]:
+                for value in probabilities[person][field]:
+                    probabilities[person][field][value] += \
+                        partial[person][field][value]
+
+    # Ensure probabilities sum to 1
+    normalize(probabilities)
+    return probabilities
+
+
+def enumeration_shards(people, shard_size):
+    """
+    Generate lists of at most `shard_size` `(have_trait, one_gene)` pairs
+    covering every assignment consistent with the known traits.
+    """
+    names = sorted(people)
+    shard = []
 
     # Loop over all sets of people who might have the trait
-    names = set(people)
     for have_trait in powerset(names):
 
         # Check if current set of people violates known information
@@ -73,24 +130,34 @@ def main():
         if fails_evidence:
             continue
 
-        # Loop over all sets of people who might have the gene
+        # Loop over all sets of people who might have one gene
         for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
-                # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+            shard.append((have_trait, one_gene))
+            if len(shard) == shard_size:
+                yield shard
+                shard = []
+    if shard:
+        yield shard
 
-    # Ensure probabilities sum to 1
-    normalize(probabilities)
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+def enumerate_shard(people, shard, deadline=None):
+    """
+    Return unnormalized probabilities summed over every assignment in
+    `shard`, a list of `(have_trait, one_gene)` pairs.
+    """
+    names = sorted(people)
+    probabilities = initial_probabilities(people)
+    for have_trait, one_gene in shard:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("enumeration deadline passed")
+
+        # Loop over all sets of people who might have two genes
+        rest = [person for person in names if person not in one_gene]
+        for two_genes in powerset(rest):
+            # Update probabilities with new joint probability
+            p = joint_probability(people, one_gene, two_genes, have_trait)
+            update(probabilities, one_gene, two_genes, have_trait, p)
+    return probabilities
 
 
 def load_data(filename):
@@ -100,21 +167,62 @@ def load_data(filename):
     mother, father must both be blank, or both be valid names in the CSV.
     trait should be 0 or 1 if trait is known, blank otherwise.
     """
-    data = dict()
     with open(filename) as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row["name"]
-            data[name] = {
-                "name": name,
-                "mother": row["mother"] or None,
-                "father": row["father"] or None,
-                "trait": (True if row["trait"] == "1" else
-                          False if row["trait"] == "0" else None)
-            }
+        return load_rows(csv.DictReader(f))
+
+
+def load_rows(rows):
+    """
+    Load gene and trait data from an iterable of rows, each a dictionary
+    with the same fields and values as a line of a `load_data` CSV file.
+    """
+    data = dict()
+    for row in rows:
+        name = row["name"]
+        data[name] = {
+            "name": name,
+            "mother": row["mother"] or None,
+            "father": row["father"] or None,
+            "trait": (True if row["trait"] == "1" else
+                      False if row["trait"] == "0" else None)
+        }
     return data
 
 
+def initial_probabilities(people):
+    """
+    Return a dictionary mapping every person to zeroed "gene" and "trait"
+    distributions, ready to be accumulated into.
+    """
+    return {
+        person: {
+            "gene": {
+                2: 0,
+                1: 0,
+                0: 0
+            },
+            "trait": {
+                True: 0,
+                False: 0
+            }
+        }
+        for person in people
+    }
+
+
+def print_probabilities(probabilities):
+    """
+    Print the gene and trait distribution of every person.
+    """
+    for person in probabilities:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
 def powerset(s):
     """
     Return a list of all possible subsets of set s.
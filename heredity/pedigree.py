@@ -0,0 +1,153 @@
+"""
+Indexed form of a `load_data` family, shared by the inference engines.
+"""
+
+from heredity import PROBS
+
+GENES = (0, 1, 2)
+
+
+def pass_probability(genes, mutation):
+    """
+    Return the probability that a parent with `genes` copies of the gene
+    passes a copy on to a child, taking mutation into account.
+    """
+    p = genes / 2
+    return p * (1 - mutation) + (1 - p) * mutation
+
+
+def inheritance_table(mutation):
+    """
+    Return a nested list `table` such that `table[m][f][c]` is the
+    probability that a child has `c` copies of the gene, given that the
+    mother has `m` copies and the father has `f` copies.
+    """
+    table = []
+    for m in GENES:
+        row = []
+        pm = pass_probability(m, mutation)
+        for f in GENES:
+            pf = pass_probability(f, mutation)
+            row.append([
+                (1 - pm) * (1 - pf),
+                pm * (1 - pf) + (1 - pm) * pf,
+                pm * pf
+            ])
+        table.append(row)
+    return table
+
+
+class Pedigree():
+    """
+    A family indexed for inference.
+
+    People are numbered so that parents always come before their
+    children, and the `PROBS` model is expanded into lookup tables:
+        * `gene_prior[g]` for people without parents,
+        * `inherit[m][f][c]` for people with parents,
+        * `trait_given_gene[g][t]` for every person.
+    """
+
+    def __init__(self, people, probs=PROBS):
+        self.names = topological_order(people)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        self.mother = []
+        self.father = []
+        self.evidence = []
+        self.children = [[] for _ in self.names]
+        for i, name in enumerate(self.names):
+            person = people[name]
+            mother = self.index.get(person["mother"])
+            father = self.index.get(person["father"])
+            if (mother is None) != (father is None):
+                raise ValueError(f"{name} must have both parents or neither")
+            self.mother.append(mother)
+            self.father.append(father)
+            self.evidence.append(person["trait"])
+            if mother is not None:
+                self.children[mother].append(i)
+                self.children[father].append(i)
+
+        self.gene_prior = [probs["gene"][g] for g in GENES]
+        self.trait_given_gene = [
+            [probs["trait"][g][False], probs["trait"][g][True]]
+            for g in GENES
+        ]
+        self.inherit = inheritance_table(probs["mutation"])
+
+    def __len__(self):
+        return len(self.names)
+
+    def gene_probability(self, i, genes):
+        """
+        Return the probability that person `i` has `genes[i]` copies of the
+        gene, given the number of copies `genes` assigns to their parents.
+        """
+        if self.mother[i] is None:
+            return self.gene_prior[genes[i]]
+        return self.inherit[genes[self.mother[i]]][genes[self.father[i]]][genes[i]]
+
+    def probabilities(self, gene_marginals, trait_marginals):
+        """
+        Convert per-index marginals into the `probabilities` dictionary
+        format used by `heredity.py`, where `gene_marginals[i][g]` and
+        `trait_marginals[i]` (the probability of having the trait) are
+        given for each person index `i`.
+        """
+        return {
+            name: {
+                "gene": {g: float(gene_marginals[i][g]) for g in (2, 1, 0)},
+                "trait": {
+                    True: float(trait_marginals[i]),
+                    False: float(1 - trait_marginals[i])
+                }
+            }
+            for i, name in enumerate(self.names)
+        }
+
+
+def topological_order(people):
+    """
+    Return the names in `people` ordered so that parents always come before
+    their children, keeping the file order wherever possible.
+    """
+    order = []
+    placed = set()
+    for name in people:
+        if name in placed:
+            continue
+
+        # Depth-first search over ancestors, with `path` holding the people
+        # whose parents are still being placed
+        path = [name]
+        pending = [parents_of(people, name)]
+        while path:
+            if pending[-1]:
+                parent = pending[-1].pop()
+                if parent in placed:
+                    continue
+                if parent in path:
+                    raise ValueError(f"{parent} is their own ancestor")
+                path.append(parent)
+                pending.append(parents_of(people, parent))
+            else:
+                pending.pop()
+                current = path.pop()
+                placed.add(current)
+                order.append(current)
+    return order
+
+
+def parents_of(people, name):
+    """
+    Return a list of the known parents of `name`, mother first.
+    """
+    parents = []
+    for parent in (people[name]["mother"], people[name]["father"]):
+        if parent is None:
+            continue
+        if parent not in people:
+            raise ValueError(f"unknown parent {parent} of {name}")
+        parents.append(parent)
+    return parents
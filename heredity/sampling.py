@@ -0,0 +1,405 @@
+"""
+Approximate inference over large families by sampling.
+
+Exact enumeration in `heredity.py` visits every assignment of genes and
+traits, which stops being feasible after a dozen or so people. The engines
+here estimate the same marginals by likelihood weighting or by Gibbs
+sampling instead. Both run many chains at once as NumPy arrays, can spread
+batches of chains over a process pool, and report diagnostics so accuracy
+can be traded for time by changing the number of samples.
+"""
+
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+# Total number of samples to draw, over all chains
+SAMPLES = 10000
+
+# Number of independent chains
+CHAINS = 100
+
+# Number of Gibbs sweeps discarded at the start of every chain
+BURN_IN = 100
+
+# Number of chains in each batch of work handed to a worker
+BATCH_CHAINS = 25
+
+# Number of batch means used to estimate Gibbs autocorrelation
+BATCH_MEANS = 20
+
+# Upper bound on array elements sampled at once by likelihood weighting
+BLOCK_ELEMENTS = 1 << 22
+
+
+def main():
+    if len(sys.argv) not in [2, 3, 4, 5]:
+        sys.exit("Usage: python sampling.py data.csv [lw|gibbs] [samples] [workers]")
+    people = load_data(sys.argv[1])
+    method = sys.argv[2] if len(sys.argv) > 2 else "gibbs"
+    samples = int(sys.argv[3]) if len(sys.argv) > 3 else SAMPLES
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+
+    if method == "lw":
+        probabilities, diagnostics = likelihood_weighting(
+            people, samples=samples, workers=workers
+        )
+    elif method == "gibbs":
+        probabilities, diagnostics = gibbs_sampling(
+            people, samples=samples, workers=workers
+        )
+    else:
+        sys.exit(f"Unknown method {method}, expected lw or gibbs")
+
+    print_probabilities(probabilities)
+    print(format_diagnostics(diagnostics))
+
+
+def likelihood_weighting(people, samples=SAMPLES, chains=CHAINS,
+                         workers=1, seed=0, probs=PROBS):
+    """
+    Estimate the gene and trait distribution of everyone in `people` by
+    likelihood weighting.
+
+    Genes are sampled forward from parents to children, and each sample is
+    weighted by the likelihood of the observed traits. Traits that were not
+    observed are Rao-Blackwellized: the estimate uses the probability of the
+    trait given the sampled genes instead of a sampled trait.
+
+    Return a tuple `(probabilities, diagnostics)`, where `probabilities`
+    has the same format as in `heredity.py`, and `diagnostics` includes the
+    effective sample size "ess" and the largest Monte Carlo standard error
+    of any person's expected gene count, "mcse".
+    """
+    start = time.perf_counter()
+    pedigree = Pedigree(people, probs)
+    draws = max(1, math.ceil(samples / chains))
+    results = run_batches(
+        sample_weighted, people, probs, chains, workers, seed, draws
+    )
+
+    # Bring the weights of every chain to a common scale
+    offset = np.concatenate([r["offset"] for r in results])
+    scale = np.exp(offset - offset.max())
+    weight = np.concatenate([r["weight"] for r in results]) * scale
+    weight_sq = np.concatenate([r["weight_sq"] for r in results]) * scale ** 2
+    genes = np.concatenate([r["genes"] for r in results]) * scale[:, None, None]
+    trait = np.concatenate([r["trait"] for r in results]) * scale[:, None]
+
+    total = weight.sum()
+    if total == 0:
+        raise ValueError("evidence has zero probability under the model")
+    gene_marginals = genes.sum(axis=0) / total
+    trait_marginals = trait.sum(axis=0) / total
+
+    # Spread of the per-chain estimates of each person's expected gene count
+    used = weight > 0
+    expected = (genes[used] @ np.arange(3)) / weight[used][:, None]
+    mcse = expected.std(axis=0, ddof=1) / math.sqrt(used.sum()) \
+        if used.sum() > 1 else np.full(len(pedigree), np.nan)
+
+    diagnostics = {
+        "method": "likelihood weighting",
+        "samples": draws * chains,
+        "chains": chains,
+        "ess": float(total ** 2 / weight_sq.sum()),
+        "mcse": float(np.nanmax(mcse)) if len(pedigree) else 0.0,
+        "seconds": time.perf_counter() - start
+    }
+    return pedigree.probabilities(gene_marginals, trait_marginals), diagnostics
+
+
+def gibbs_sampling(people, samples=SAMPLES, chains=CHAINS, burn_in=BURN_IN,
+                   workers=1, seed=0, probs=PROBS):
+    """
+    Estimate the gene and trait distribution of everyone in `people` by
+    Gibbs sampling.
+
+    Each sweep resamples every person's gene count from its distribution
+    given their parents, their children, their children's other parents and
+    their own observed trait. The estimates average those conditional
+    distributions rather than the sampled values (Rao-Blackwellization).
+
+    Return a tuple `(probabilities, diagnostics)`, where `probabilities`
+    has the same format as in `heredity.py`, and `diagnostics` reports the
+    smallest effective sample size "ess", the largest potential scale
+    reduction factor "rhat" and the largest Monte Carlo standard error
+    "mcse" over everyone's expected gene count.
+    """
+    start = time.perf_counter()
+    pedigree = Pedigree(people, probs)
+    draws = max(2, math.ceil(samples / chains))
+    results = run_batches(
+        sample_gibbs, people, probs, chains, workers, seed, draws, burn_in
+    )
+
+    genes = np.concatenate([r["genes"] for r in results])
+    trait = np.concatenate([r["trait"] for r in results])
+    gene_marginals = genes.sum(axis=0) / (chains * draws)
+    trait_marginals = trait.sum(axis=0) / (chains * draws)
+
+    # Chain means and variances of each person's expected gene count
+    means = np.concatenate([r["total"] for r in results]) / draws
+    squares = np.concatenate([r["squares"] for r in results]) / draws
+    variances = np.maximum(squares - means ** 2, 0) * draws / (draws - 1)
+    within = variances.mean(axis=0)
+    between = draws * means.var(axis=0, ddof=1) if chains > 1 else 0
+    pooled = (draws - 1) / draws * within + between / draws
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rhat = np.where(within > 0, np.sqrt(pooled / within), 1.0)
+
+    # Effective sample size from the variance of batch means
+    batch_means = np.concatenate([r["batch_means"] for r in results], axis=1)
+    batch_length = draws / batch_means.shape[0]
+    batch_variance = batch_length * batch_means.var(axis=(0, 1), ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ess = np.where(
+            batch_variance > 0,
+            chains * draws * pooled / batch_variance,
+            chains * draws
+        )
+    ess = np.clip(ess, 1, chains * draws)
+    mcse = np.sqrt(pooled / ess)
+
+    diagnostics = {
+        "method": "gibbs",
+        "samples": draws * chains,
+        "chains": chains,
+        "burn_in": burn_in,
+        "ess": float(ess.min()) if len(pedigree) else 0.0,
+        "rhat": float(rhat.max()) if len(pedigree) else 1.0,
+        "mcse": float(mcse.max()) if len(pedigree) else 0.0,
+        "ess_by_person": dict(zip(pedigree.names, ess.tolist())),
+        "rhat_by_person": dict(zip(pedigree.names, rhat.tolist())),
+        "seconds": time.perf_counter() - start
+    }
+    return pedigree.probabilities(gene_marginals, trait_marginals), diagnostics
+
+
+def run_batches(sampler, people, probs, chains, workers, seed, *args):
+    """
+    Split `chains` into batches of `BATCH_CHAINS`, run `sampler` on each and
+    return the list of their results in batch order.
+
+    Every batch gets its own random stream derived from `seed`, so the
+    results do not depend on the number of `workers`.
+    """
+    sizes = [BATCH_CHAINS] * (chains // BATCH_CHAINS)
+    if chains % BATCH_CHAINS:
+        sizes.append(chains % BATCH_CHAINS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [
+        (people, probs, size, seed) + args
+        for size, seed in zip(sizes, seeds)
+    ]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run_task, [sampler] * len(tasks), tasks))
+    return [run_task(sampler, task) for task in tasks]
+
+
+def run_task(sampler, task):
+    return sampler(*task)
+
+
+class Tables():
+    """
+    The model tables of a `Pedigree` as NumPy arrays.
+    """
+
+    def __init__(self, pedigree):
+        self.prior_cdf = np.cumsum(pedigree.gene_prior)
+        self.inherit_cdf = np.cumsum(pedigree.inherit, axis=2)
+        with np.errstate(divide="ignore"):
+            self.log_prior = np.log(pedigree.gene_prior)
+            self.log_inherit = np.log(pedigree.inherit)
+            self.log_trait = np.log(pedigree.trait_given_gene)
+        self.trait_true = np.array(pedigree.trait_given_gene)[:, 1]
+
+
+def sample_forward(pedigree, tables, rng, count):
+    """
+    Sample `count` gene assignments from the prior, ignoring evidence.
+    Return an array of shape (count, number of people).
+    """
+    genes = np.empty((count, len(pedigree)), dtype=np.int8)
+    for i in range(len(pedigree)):
+        u = rng.random(count)
+        if pedigree.mother[i] is None:
+            cdf = tables.prior_cdf
+            genes[:, i] = (u >= cdf[0]).astype(np.int8) + (u >= cdf[1])
+        else:
+            cdf = tables.inherit_cdf[
+                genes[:, pedigree.mother[i]], genes[:, pedigree.father[i]]
+            ]
+            genes[:, i] = (u >= cdf[:, 0]).astype(np.int8) + (u >= cdf[:, 1])
+    return genes
+
+
+def sample_weighted(people, probs, chains, seed, draws):
+    """
+    Run likelihood weighting for a batch of `chains` chains of `draws`
+    samples each, returning per-chain weighted sums.
+
+    Weights are accumulated relative to a per-chain `offset` in log space,
+    so large families do not underflow.
+    """
+    pedigree = Pedigree(people, probs)
+    tables = Tables(pedigree)
+    rng = np.random.default_rng(seed)
+    n = len(pedigree)
+    observed = [i for i in range(n) if pedigree.evidence[i] is not None]
+    unobserved = [i for i in range(n) if pedigree.evidence[i] is None]
+
+    offset = np.full(chains, -np.inf)
+    weight = np.zeros(chains)
+    weight_sq = np.zeros(chains)
+    genes = np.zeros((chains, n, 3))
+    trait = np.zeros((chains, n))
+
+    block = max(1, min(draws, BLOCK_ELEMENTS // max(1, chains * n)))
+    done = 0
+    while done < draws:
+        size = min(block, draws - done)
+        done += size
+        sample = sample_forward(pedigree, tables, rng, chains * size)
+
+        # Log likelihood of the evidence under each sample
+        log_weight = np.zeros(chains * size)
+        for i in observed:
+            log_weight += tables.log_trait[sample[:, i], int(pedigree.evidence[i])]
+        log_weight = log_weight.reshape(chains, size)
+
+        # Move every chain to a common offset before adding the new block
+        new_offset = np.maximum(offset, log_weight.max(axis=1))
+        finite = np.isfinite(new_offset)
+        rescale = np.where(finite, np.exp(offset - np.where(finite, new_offset, 0)), 0)
+        weight *= rescale
+        weight_sq *= rescale ** 2
+        genes *= rescale[:, None, None]
+        trait *= rescale[:, None]
+        offset = new_offset
+
+        w = np.exp(log_weight - np.where(finite, offset, 0)[:, None])
+        w[~finite] = 0
+        weight += w.sum(axis=1)
+        weight_sq += (w ** 2).sum(axis=1)
+        sample = sample.reshape(chains, size, n)
+        for g in range(3):
+            genes[:, :, g] += np.einsum("cs,csn->cn", w, (sample == g).astype(float))
+        for i in unobserved:
+            trait[:, i] += (w * tables.trait_true[sample[:, :, i]]).sum(axis=1)
+        for i in observed:
+            if pedigree.evidence[i]:
+                trait[:, i] += w.sum(axis=1)
+
+    return {
+        "offset": np.where(np.isfinite(offset), offset, 0),
+        "weight": weight,
+        "weight_sq": weight_sq,
+        "genes": genes,
+        "trait": trait
+    }
+
+
+def sample_gibbs(people, probs, chains, seed, draws, burn_in):
+    """
+    Run `burn_in + draws` Gibbs sweeps on a batch of `chains` chains,
+    returning per-chain sums of the conditional gene distributions along
+    with the statistics needed for convergence diagnostics.
+    """
+    pedigree = Pedigree(people, probs)
+    tables = Tables(pedigree)
+    rng = np.random.default_rng(seed)
+    n = len(pedigree)
+    rows = np.arange(chains)
+    counts = np.arange(3)
+
+    # Start each chain from a forward sample of the prior
+    state = sample_forward(pedigree, tables, rng, chains)
+
+    genes = np.zeros((chains, n, 3))
+    trait = np.zeros((chains, n))
+    total = np.zeros((chains, n))
+    squares = np.zeros((chains, n))
+    batches = min(BATCH_MEANS, draws)
+    batch_means = np.zeros((batches, chains, n))
+    batch_sizes = np.zeros(batches)
+
+    for sweep in range(burn_in + draws):
+        keep = sweep >= burn_in
+        if keep:
+            batch = (sweep - burn_in) * batches // draws
+            batch_sizes[batch] += 1
+        for i in range(n):
+
+            # Log probability of each gene count given the rest of the state
+            if pedigree.mother[i] is None:
+                logits = np.broadcast_to(tables.log_prior, (chains, 3)).copy()
+            else:
+                logits = tables.log_inherit[
+                    state[:, pedigree.mother[i]], state[:, pedigree.father[i]]
+                ].copy()
+            if pedigree.evidence[i] is not None:
+                logits += tables.log_trait[:, int(pedigree.evidence[i])]
+            for child in pedigree.children[i]:
+                if pedigree.mother[child] == i:
+                    logits += tables.log_inherit[
+                        :, state[:, pedigree.father[child]], state[:, child]
+                    ].T
+                else:
+                    logits += tables.log_inherit[
+                        state[:, pedigree.mother[child]], :, state[:, child]
+                    ]
+
+            # Normalize and sample a new gene count for every chain
+            logits -= logits.max(axis=1, keepdims=True)
+            conditional = np.exp(logits)
+            conditional /= conditional.sum(axis=1, keepdims=True)
+            u = rng.random(chains)
+            cdf = np.cumsum(conditional, axis=1)
+            state[rows, i] = (u >= cdf[:, 0]).astype(np.int8) + (u >= cdf[:, 1])
+
+            if keep:
+                genes[:, i] += conditional
+                if pedigree.evidence[i] is None:
+                    trait[:, i] += conditional @ tables.trait_true
+                elif pedigree.evidence[i]:
+                    trait[:, i] += 1
+                expected = conditional @ counts
+                total[:, i] += expected
+                squares[:, i] += expected ** 2
+                batch_means[batch, :, i] += expected
+
+    batch_means /= batch_sizes[:, None, None]
+    return {
+        "genes": genes,
+        "trait": trait,
+        "total": total,
+        "squares": squares,
+        "batch_means": batch_means
+    }
+
+
+def format_diagnostics(diagnostics):
+    """
+    Return a one-line summary of sampler `diagnostics`.
+    """
+    line = (f"{diagnostics['method']}: {diagnostics['samples']} samples "
+            f"in {diagnostics['chains']} chains, "
+            f"ESS {diagnostics['ess']:.1f}")
+    if "rhat" in diagnostics:
+        line += f", R-hat {diagnostics['rhat']:.4f}"
+    line += (f", MCSE {diagnostics['mcse']:.4f}, "
+             f"{diagnostics['seconds']:.2f}s")
+    return line
+
+
+if __name__ == "__main__":
+    main()
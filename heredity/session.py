@@ -0,0 +1,383 @@
+"""
+Stateful exact inference for trait evidence that arrives one person at a
+time.
+
+An `InferenceSession` compiles a family into a junction tree over
+everyone's gene count, and caches the messages passed between its cliques.
+Observing or retracting a single person's trait only changes the potential
+of the clique holding that person, so only the messages flowing away from
+that clique are dropped from the cache. Marginals are then recomputed from
+the remaining cached messages, which is far cheaper than enumerating every
+assignment again.
+
+Run `python session.py data.csv`, then enter lines such as `Harry 1`,
+`Harry 0` or `Harry ?` to observe or retract traits.
+"""
+
+import heapq
+import itertools
+import sys
+import time
+
+from heredity import PROBS, load_data, print_probabilities
+from pedigree import Pedigree
+
+# Largest clique, in people, whose 3 ** size table may be built
+MAX_CLIQUE = 12
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python session.py data.csv")
+    session = InferenceSession(load_data(sys.argv[1]))
+    print_probabilities(session.marginals())
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            name, value = line.split()
+            trait = {"1": True, "0": False, "?": None}[value]
+            start = time.perf_counter()
+            session.observe(name, trait)
+            probabilities = session.marginals()
+            elapsed = time.perf_counter() - start
+        except (ValueError, KeyError):
+            print("Enter a name followed by 1, 0 or ?")
+            continue
+        print_probabilities(probabilities)
+        print(f"Updated in {elapsed * 1000:.2f}ms")
+
+
+class CliqueTooLarge(ValueError):
+    """
+    Raised for a family whose junction tree needs a clique of more than
+    `MAX_CLIQUE` people.
+    """
+
+
+class InferenceSession():
+    """
+    Exact marginals of a family under changing trait evidence.
+    """
+
+    def __init__(self, people, probs=PROBS):
+        self.pedigree = Pedigree(people, probs)
+        pedigree = self.pedigree
+        n = len(pedigree)
+
+        # Build the junction tree and place each family's factor in a
+        # clique containing the person and both parents
+        order = elimination_order(moral_graph(pedigree))
+        self.cliques, self.neighbors, self.home = junction_tree(pedigree, order)
+        width = max((len(clique) for clique in self.cliques), default=0)
+        if width > MAX_CLIQUE:
+            raise CliqueTooLarge(
+                f"family needs a clique of {width} people, "
+                f"more than MAX_CLIQUE ({MAX_CLIQUE})"
+            )
+        self.members = [
+            [i for i in range(n) if self.home[i] == u]
+            for u in range(len(self.cliques))
+        ]
+
+        # Map each clique assignment to the digit of every variable in it
+        self.assignments = [
+            list(itertools.product(range(3), repeat=len(clique)))
+            for clique in self.cliques
+        ]
+
+        # Map each clique assignment to an assignment of every separator
+        self.projections = dict()
+        for u, clique in enumerate(self.cliques):
+            for v in self.neighbors[u]:
+                separator = sorted(set(clique) & set(self.cliques[v]))
+                positions = [clique.index(x) for x in separator]
+                self.projections[u, v] = [
+                    flat_index(assignment[p] for p in positions)
+                    for assignment in self.assignments[u]
+                ]
+
+        # Product of the inheritance factors placed in each clique
+        self.static = []
+        for u, clique in enumerate(self.cliques):
+            values = []
+            for assignment in self.assignments[u]:
+                genes = dict(zip(clique, assignment))
+                p = 1.0
+                for i in self.members[u]:
+                    p *= pedigree.gene_probability(i, genes)
+                values.append(p)
+            self.static.append(values)
+
+        self.evidence = list(pedigree.evidence)
+        self.potentials = [None] * len(self.cliques)
+        self.messages = dict()
+        self.beliefs = dict()
+        self.stats = {"messages": 0, "potentials": 0}
+
+    def observe(self, name, trait):
+        """
+        Set the observed trait of `name` to True or False, or retract it if
+        `trait` is None.
+        """
+        i = self.pedigree.index[name]
+        if self.evidence[i] == trait:
+            return
+        self.evidence[i] = trait
+        self.invalidate(self.home[i])
+
+    def retract(self, name):
+        """
+        Forget the observed trait of `name`.
+        """
+        self.observe(name, None)
+
+    def invalidate(self, u):
+        """
+        Drop the potential of clique `u`, every cached message that depends
+        on it, and every cached belief.
+        """
+        self.potentials[u] = None
+        self.beliefs.clear()
+        frontier = [u]
+        visited = {u}
+        while frontier:
+            a = frontier.pop()
+            for b in self.neighbors[a]:
+                if b not in visited:
+                    visited.add(b)
+                    self.messages.pop((a, b), None)
+                    frontier.append(b)
+
+    def potential(self, u):
+        """
+        Return the potential of clique `u`: its inheritance factors times
+        the likelihood of the observed traits of the people placed in it.
+        """
+        if self.potentials[u] is None:
+            self.stats["potentials"] += 1
+            values = list(self.static[u])
+            trait_given_gene = self.pedigree.trait_given_gene
+            for i in self.members[u]:
+                if self.evidence[i] is None:
+                    continue
+                position = self.cliques[u].index(i)
+                t = int(self.evidence[i])
+                for j, assignment in enumerate(self.assignments[u]):
+                    values[j] *= trait_given_gene[assignment[position]][t]
+            self.potentials[u] = values
+        return self.potentials[u]
+
+    def message(self, u, v):
+        """
+        Compute, cache and return the normalized message from clique `u` to
+        its neighbor `v`, assuming every message into `u` is cached.
+        """
+        self.stats["messages"] += 1
+        values = list(self.potential(u))
+        for w in self.neighbors[u]:
+            if w != v:
+                incoming = self.messages[w, u]
+                projection = self.projections[u, w]
+                for j in range(len(values)):
+                    values[j] *= incoming[projection[j]]
+
+        separator = [0.0] * 3 ** len(set(self.cliques[u]) & set(self.cliques[v]))
+        projection = self.projections[u, v]
+        for j, value in enumerate(values):
+            separator[projection[j]] += value
+        total = sum(separator)
+        if total == 0:
+            raise ValueError("evidence has zero probability under the model")
+        message = [value / total for value in separator]
+        self.messages[u, v] = message
+        return message
+
+    def collect(self, root):
+        """
+        Make sure every message into clique `root` is cached, computing
+        missing ones from the leaves inward.
+        """
+        # Find the directed edges whose messages are missing, parents first
+        missing = []
+        stack = [(w, root) for w in self.neighbors[root]]
+        while stack:
+            u, v = stack.pop()
+            if (u, v) in self.messages:
+                continue
+            missing.append((u, v))
+            stack.extend((w, u) for w in self.neighbors[u] if w != v)
+
+        # Compute them children first
+        for u, v in reversed(missing):
+            self.message(u, v)
+
+    def belief(self, u):
+        """
+        Return the normalized distribution over assignments of clique `u`.
+        """
+        if u not in self.beliefs:
+            self.collect(u)
+            values = list(self.potential(u))
+            for w in self.neighbors[u]:
+                incoming = self.messages[w, u]
+                projection = self.projections[u, w]
+                for j in range(len(values)):
+                    values[j] *= incoming[projection[j]]
+            total = sum(values)
+            if total == 0:
+                raise ValueError("evidence has zero probability under the model")
+            self.beliefs[u] = [value / total for value in values]
+        return self.beliefs[u]
+
+    def gene_marginal(self, i):
+        u = self.home[i]
+        position = self.cliques[u].index(i)
+        marginal = [0.0, 0.0, 0.0]
+        for assignment, p in zip(self.assignments[u], self.belief(u)):
+            marginal[assignment[position]] += p
+        return marginal
+
+    def trait_marginal(self, i, gene_marginal):
+        if self.evidence[i] is not None:
+            return 1.0 if self.evidence[i] else 0.0
+        return sum(
+            gene_marginal[g] * self.pedigree.trait_given_gene[g][1]
+            for g in range(3)
+        )
+
+    def marginal(self, name):
+        """
+        Return the gene and trait distribution of `name`, in the format of
+        one person's entry in `heredity.py` probabilities.
+        """
+        i = self.pedigree.index[name]
+        gene = self.gene_marginal(i)
+        trait = self.trait_marginal(i, gene)
+        return {
+            "gene": {g: gene[g] for g in (2, 1, 0)},
+            "trait": {True: trait, False: 1 - trait}
+        }
+
+    def marginals(self):
+        """
+        Return the gene and trait distribution of everyone in the family,
+        in the same format as `heredity.py` probabilities.
+        """
+        genes = [self.gene_marginal(i) for i in range(len(self.pedigree))]
+        traits = [self.trait_marginal(i, genes[i]) for i in range(len(genes))]
+        return self.pedigree.probabilities(genes, traits)
+
+
+def flat_index(digits):
+    """
+    Return the position of an assignment of gene counts in a flat table.
+    """
+    index = 0
+    for digit in digits:
+        index = 3 * index + digit
+    return index
+
+
+def moral_graph(pedigree):
+    """
+    Return the moral graph of `pedigree` as a list of neighbor sets:
+    everyone is connected to their parents, and parents to each other.
+    """
+    graph = [set() for _ in range(len(pedigree))]
+    for i in range(len(pedigree)):
+        mother, father = pedigree.mother[i], pedigree.father[i]
+        if mother is None:
+            continue
+        for a, b in [(i, mother), (i, father), (mother, father)]:
+            if a != b:
+                graph[a].add(b)
+                graph[b].add(a)
+    return graph
+
+
+def elimination_order(graph):
+    """
+    Return an elimination order for `graph` chosen greedily by fewest fill
+    edges, then fewest neighbors.
+    """
+    graph = [set(neighbors) for neighbors in graph]
+
+    def cost(v):
+        fill = sum(
+            1 for a, b in itertools.combinations(graph[v], 2)
+            if b not in graph[a]
+        )
+        return (fill, len(graph[v]))
+
+    heap = [(cost(v), v) for v in range(len(graph))]
+    heapq.heapify(heap)
+    current = {v: c for c, v in heap}
+    order = []
+    eliminated = set()
+    while heap:
+        c, v = heapq.heappop(heap)
+        if v in eliminated or current[v] != c:
+            continue
+        order.append(v)
+        eliminated.add(v)
+
+        # Connect the neighbors of `v` to each other, then remove `v`
+        neighbors = graph[v]
+        for a, b in itertools.combinations(neighbors, 2):
+            graph[a].add(b)
+            graph[b].add(a)
+        for a in neighbors:
+            graph[a].discard(v)
+
+        # Only the costs of vertices near `v` can have changed
+        touched = set(neighbors)
+        for a in neighbors:
+            touched |= graph[a]
+        for a in touched - eliminated:
+            current[a] = cost(a)
+            heapq.heappush(heap, (current[a], a))
+    return order
+
+
+def junction_tree(pedigree, order):
+    """
+    Build a junction tree from an elimination `order` of the moral graph.
+
+    Return `(cliques, neighbors, home)`: the variables of each clique, the
+    neighbors of each clique in the tree, and for each person the clique
+    holding their family factor.
+    """
+    graph = moral_graph(pedigree)
+    position = {v: k for k, v in enumerate(order)}
+    cliques = []
+    parent = []
+    for v in order:
+        later = sorted(graph[v], key=position.get)
+        cliques.append((v,) + tuple(later))
+        parent.append(position[later[0]] if later else None)
+        for a, b in itertools.combinations(later, 2):
+            graph[a].add(b)
+            graph[b].add(a)
+        for a in later:
+            graph[a].discard(v)
+
+    neighbors = [[] for _ in cliques]
+    for u, p in enumerate(parent):
+        if p is not None:
+            neighbors[u].append(p)
+            neighbors[p].append(u)
+
+    # A family's first eliminated member has the others as neighbors
+    home = []
+    for i in range(len(pedigree)):
+        family = [i]
+        if pedigree.mother[i] is not None:
+            family += [pedigree.mother[i], pedigree.father[i]]
+        home.append(min(position[x] for x in family))
+    return cliques, neighbors, home
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Random multi-generation families in the `load_data` CSV format.
+
+Families grow from a founding couple. Each child is added to a random
+couple whose children still fit within the requested number of
+generations, and some children marry in a spouse from outside the family
+to found a couple of their own. Genes and traits are sampled from `PROBS`,
+and a share of the traits is kept as evidence, so the evidence always has
+non-zero probability under the model.
+"""
+
+import csv
+import random
+import sys
+
+from heredity import PROBS
+from pedigree import inheritance_table
+
+# Probability that a child who may still have children marries in a spouse
+MARRIAGE = 0.7
+
+
+def main():
+    if len(sys.argv) not in [4, 5, 6]:
+        sys.exit("Usage: python synthetic.py size depth evidence "
+                 "[seed] [output.csv]")
+    size = int(sys.argv[1])
+    depth = int(sys.argv[2])
+    evidence = float(sys.argv[3])
+    seed = int(sys.argv[4]) if len(sys.argv) >= 5 else None
+    people = generate_family(size, depth, evidence, seed)
+    if len(sys.argv) == 6:
+        with open(sys.argv[5], "w", newline="") as f:
+            write_data(people, f)
+    else:
+        write_data(people, sys.stdout)
+
+
+def generate_family(size, depth, evidence=0.5, seed=None, probs=PROBS):
+    """
+    Return a family of `size` people over at most `depth` generations, in
+    the format returned by `load_data`, where each person's trait is known
+    with probability `evidence`.
+    """
+    if size < 1 or depth < 1:
+        raise ValueError("size and depth must be positive")
+    rng = random.Random(seed)
+    people = dict()
+    genes = dict()
+    generation = dict()
+    couples = []
+    inherit = inheritance_table(probs["mutation"])
+
+    def add(mother=None, father=None, level=0):
+        name = f"P{len(people) + 1}"
+        if mother is None:
+            weights = [probs["gene"][g] for g in range(3)]
+        else:
+            weights = inherit[genes[mother]][genes[father]]
+        genes[name] = rng.choices(range(3), weights)[0]
+        trait = rng.random() < probs["trait"][genes[name]][True]
+        people[name] = {
+            "name": name,
+            "mother": mother,
+            "father": father,
+            "trait": trait if rng.random() < evidence else None
+        }
+        generation[name] = level
+        return name
+
+    # Found the family with a couple, if there is room for their children
+    if size == 1 or depth == 1:
+        for _ in range(size):
+            add()
+        return people
+    couples.append((add(), add()))
+
+    while len(people) < size:
+        mother, father = rng.choice(couples)
+        level = generation[mother] + 1
+        child = add(mother, father, level)
+
+        # Some children marry in a spouse and may have children of their own
+        if (level < depth - 1 and len(people) < size
+                and rng.random() < MARRIAGE):
+            spouse = add(level=level)
+            if rng.random() < 0.5:
+                couples.append((child, spouse))
+            else:
+                couples.append((spouse, child))
+    return people
+
+
+def write_data(people, f):
+    """
+    Write `people` to the file object `f` in the `load_data` CSV format.
+    """
+    writer = csv.writer(f)
+    writer.writerow(["name", "mother", "father", "trait"])
+    for person in people.values():
+        trait = person["trait"]
+        writer.writerow([
+            person["name"],
+            person["mother"] or "",
+            person["father"] or "",
+            "" if trait is None else int(trait)
+        ])
+
+
+if __name__ == "__main__":
+    main()
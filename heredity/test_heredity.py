@@ -0,0 +1,180 @@
+import os
+
+import batch
+import benchmark
+import graycode
+import heredity
+import sampling
+import session
+import synthetic
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Marginals of data/family0.csv from exact enumeration
+FAMILY0 = {
+    "Harry": {"gene": {2: 0.0092, 1: 0.4557, 0: 0.5351}, "trait": 0.2665},
+    "James": {"gene": {2: 0.1976, 1: 0.5106, 0: 0.2918}, "trait": 1.0},
+    "Lily": {"gene": {2: 0.0036, 1: 0.0136, 0: 0.9827}, "trait": 0.0}
+}
+
+
+def close_to_family0(probabilities, tolerance):
+    for person, expected in FAMILY0.items():
+        for g, p in expected["gene"].items():
+            if abs(probabilities[person]["gene"][g] - p) > tolerance:
+                return False
+        if abs(probabilities[person]["trait"][True] - expected["trait"]) > tolerance:
+            return False
+    return True
+
+
+def test_enumerate_probabilities():
+    """enumerate_probabilities computes the exact marginals"""
+    people = heredity.load_data(os.path.join(DATA, "family0.csv"))
+    assert close_to_family0(heredity.enumerate_probabilities(people), 1e-4)
+
+
+def test_enumerate_workers():
+    """Sharded enumeration is bitwise identical for any number of workers"""
+    people = heredity.load_data(os.path.join(DATA, "family1.csv"))
+    one = heredity.enumerate_probabilities(people, workers=1, shard_size=8)
+    two = heredity.enumerate_probabilities(people, workers=2, shard_size=8)
+    assert one == two
+
+
+def max_difference(a, b):
+    return max(
+        abs(a[person][field][value] - b[person][field][value])
+        for person in a for field in a[person] for value in a[person][field]
+    )
+
+
+def test_gray_code_probabilities():
+    """Gray code enumeration agrees with brute-force enumeration"""
+    for filename in ["family0.csv", "family1.csv", "family2.csv"]:
+        people = heredity.load_data(os.path.join(DATA, filename))
+        expected = heredity.enumerate_probabilities(people)
+        result = graycode.gray_code_probabilities(people)
+        assert max_difference(expected, result) < 1e-12
+
+
+def test_inference_session():
+    """InferenceSession tracks exact marginals as evidence changes"""
+    people = heredity.load_data(os.path.join(DATA, "family1.csv"))
+    inference = session.InferenceSession(people)
+    expected = heredity.enumerate_probabilities(people)
+    assert max_difference(expected, inference.marginals()) < 1e-12
+
+    for name, trait in [("Ginny", True), ("Fred", False), ("Ron", True)]:
+        inference.observe(name, trait)
+        people[name]["trait"] = trait
+        expected = heredity.enumerate_probabilities(people)
+        assert max_difference(expected, inference.marginals()) < 1e-12
+
+    inference.retract("Fred")
+    people["Fred"]["trait"] = None
+    expected = heredity.enumerate_probabilities(people)
+    assert max_difference(expected, inference.marginals()) < 1e-12
+
+
+def test_generate_family():
+    """generate_family respects the size and depth of the family"""
+    people = synthetic.generate_family(40, 3, evidence=0.5, seed=1)
+    assert len(people) == 40
+
+    def depth(name):
+        mother = people[name]["mother"]
+        return 1 if mother is None else 1 + depth(mother)
+
+    assert max(depth(name) for name in people) <= 3
+    assert any(person["trait"] is not None for person in people.values())
+
+
+def test_synthetic_engines_agree():
+    """Exact engines agree with one another on a synthetic family"""
+    people = synthetic.generate_family(7, 3, evidence=0.5, seed=2)
+    expected = heredity.enumerate_probabilities(people)
+    assert max_difference(expected, graycode.gray_code_probabilities(people)) < 1e-12
+    inference = session.InferenceSession(people)
+    assert max_difference(expected, inference.marginals()) < 1e-12
+
+
+def test_likelihood_weighting():
+    """likelihood_weighting approximates the exact marginals"""
+    people = heredity.load_data(os.path.join(DATA, "family0.csv"))
+    probabilities, diagnostics = sampling.likelihood_weighting(people, samples=50000)
+    assert close_to_family0(probabilities, 0.02)
+    assert 0 < diagnostics["ess"] <= diagnostics["samples"]
+
+
+def test_gibbs_sampling():
+    """gibbs_sampling approximates the exact marginals and has converged"""
+    people = heredity.load_data(os.path.join(DATA, "family0.csv"))
+    probabilities, diagnostics = sampling.gibbs_sampling(people, samples=20000)
+    assert close_to_family0(probabilities, 0.02)
+    assert diagnostics["rhat"] < 1.1
+
+
+def test_sampling_workers():
+    """Sampling results do not depend on the number of workers"""
+    people = heredity.load_data(os.path.join(DATA, "family1.csv"))
+    one, _ = sampling.gibbs_sampling(people, samples=2000, workers=1)
+    two, _ = sampling.gibbs_sampling(people, samples=2000, workers=2)
+    assert one == two
+
+
+def test_batch_fallback():
+    """score_family falls back to sampling for oversized families"""
+    people = heredity.load_data(os.path.join(DATA, "family0.csv"))
+    exact = batch.score_family("family0", people)
+    assert exact["engine"] == "exact"
+    assert close_to_family0(exact["marginals"], 1e-4)
+    sampled = batch.score_family("family0", people, budget=1)
+    assert sampled["engine"] == "gibbs" and sampled["fallback"] == "size"
+    assert close_to_family0(sampled["marginals"], 0.05)
+
+
+def test_benchmark_skips_session():
+    """The benchmark skips the session when a family needs too large a clique"""
+    people = synthetic.generate_family(7, 3, evidence=0.5, seed=2)
+    engines = [engine for engine in benchmark.ENGINES
+               if engine[0] in ["graycode", "session"]]
+    limit = session.MAX_CLIQUE
+    session.MAX_CLIQUE = 1
+    try:
+        results = benchmark.benchmark(people, engines)
+    finally:
+        session.MAX_CLIQUE = limit
+    assert [(name, status) for name, _, _, status in results] == [
+        ("graycode", "ok"), ("session", "skipped")
+    ]
+    statuses = [status for _, _, _, status in benchmark.benchmark(people, engines)]
+    assert statuses == ["ok", "ok"]
+
+    # Other errors are not taken for a skip
+    child = next(person for person in people.values() if person["mother"])
+    child["mother"] = "Nobody"
+    try:
+        benchmark.session_probabilities(people)
+        assert False, "unknown parent accepted"
+    except ValueError as error:
+        assert not isinstance(error, session.CliqueTooLarge)
+
+
+def main():
+    test_enumerate_probabilities()
+    test_enumerate_workers()
+    test_gray_code_probabilities()
+    test_inference_session()
+    test_generate_family()
+    test_synthetic_engines_agree()
+    test_likelihood_weighting()
+    test_gibbs_sampling()
+    test_sampling_workers()
+    test_batch_fallback()
+    test_benchmark_skips_session()
+    print("heredity tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""
+Reduced ordered binary decision diagrams for `logic.py` sentences.
+
+A knowledge base is compiled once into a BDD: a DAG in which every node
+tests one variable and has a low child (variable false) and a high child
+(variable true), with variables tested in a fixed order and no two nodes
+alike. Equal functions then have the same node, so once the knowledge base
+is compiled, entailment, model counting and conditioning take time
+polynomial in the size of the diagram, however many models there are.
+
+Nodes are kept in parallel lists and shared through a unique table, and
+every `ite` (if-then-else) result is cached. The size of a BDD depends
+heavily on the variable order, and by default variables are ordered by
+their first appearance in a depth-first walk of the sentences, which keeps
+variables that are used together close in the order.
+
+Run `python bdd.py` to compile the puzzles and compare with `model_check`.
+"""
+
+import sys
+import time
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check
+
+FALSE = 0
+TRUE = 1
+
+# Level of the two terminal nodes, below every variable
+TERMINAL = sys.maxsize
+
+
+class BDD():
+    """
+    A shared store of BDD nodes over an ordered list of variables.
+
+    Nodes are integers: `FALSE`, `TRUE`, or an index into `level`, `low`
+    and `high`. Variables not yet in the order are added below the others
+    when first used, which leaves every existing node valid.
+    """
+
+    def __init__(self, order=()):
+        self.order = []
+        self.levels = dict()
+        self.level = [TERMINAL, TERMINAL]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+        self.unique = dict()
+        self.cache = dict()
+
+        # Node for each compiled interned sentence, by identity, keeping
+        # the sentence alive so its id is not reused. Other sentences can
+        # be added to after they are compiled, so are compiled again.
+        self.compiled = dict()
+        self.stats = {"ite": 0, "cache hits": 0}
+        for name in order:
+            self.variable(name)
+
+    def __len__(self):
+        return len(self.level)
+
+    def variable(self, name):
+        """
+        Return the level of the variable called `name`, adding it to the
+        order if it is new.
+        """
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+        return self.levels[name]
+
+    def node(self, level, low, high):
+        """
+        Return the node testing the variable at `level` with children `low`
+        and `high`, creating it only if no such node exists.
+        """
+        if low == high:
+            return low
+        key = (level, low, high)
+        u = self.unique.get(key)
+        if u is None:
+            u = len(self.level)
+            self.level.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = u
+        return u
+
+    def ite(self, f, g, h):
+        """
+        Return the node for "if `f` then `g` else `h`".
+        """
+        # Terminal cases
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+
+        key = (f, g, h)
+        result = self.cache.get(key)
+        self.stats["ite"] += 1
+        if result is not None:
+            self.stats["cache hits"] += 1
+            return result
+
+        # Split on the top variable of the three
+        top = min(self.level[f], self.level[g], self.level[h])
+        f0, f1 = self.cofactors(f, top)
+        g0, g1 = self.cofactors(g, top)
+        h0, h1 = self.cofactors(h, top)
+        result = self.node(top, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.cache[key] = result
+        return result
+
+    def cofactors(self, u, level):
+        """
+        Return the nodes for `u` with the variable at `level` set false and
+        set true.
+        """
+        if self.level[u] != level:
+            return u, u
+        return self.low[u], self.high[u]
+
+    def negate(self, f):
+        return self.ite(f, FALSE, TRUE)
+
+    def compile(self, sentence):
+        """
+        Return the node for `sentence`.
+
+        The tree is walked with an explicit stack, and every subsentence is
+        compiled once per call. Interned subsentences, which cannot change,
+        are compiled once for good.
+        """
+        nodes = dict()
+        stack = [(sentence, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in nodes:
+                continue
+            if node._interned is not None and id(node) in self.compiled:
+                nodes[id(node)] = self.compiled[id(node)][1]
+                continue
+            operands = node.operands()
+            if not ready:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in operands)
+                continue
+            parts = [nodes[id(operand)] for operand in operands]
+            u = self.combine(node, parts)
+            nodes[id(node)] = u
+            if node._interned is not None:
+                self.compiled[id(node)] = (node, u)
+        return nodes[id(sentence)]
+
+    def combine(self, sentence, parts):
+        """
+        Return the node for `sentence`, given the nodes of its operands.
+        """
+        if isinstance(sentence, Symbol):
+            return self.node(self.variable(sentence.name), FALSE, TRUE)
+        if isinstance(sentence, Not):
+            return self.negate(parts[0])
+        if isinstance(sentence, And):
+            result = TRUE
+            for part in parts:
+                result = self.ite(result, part, FALSE)
+            return result
+        if isinstance(sentence, Or):
+            result = FALSE
+            for part in parts:
+                result = self.ite(result, TRUE, part)
+            return result
+        if isinstance(sentence, Implication):
+            return self.ite(parts[0], parts[1], TRUE)
+        if isinstance(sentence, Biconditional):
+            return self.ite(parts[0], parts[1], self.negate(parts[1]))
+        raise TypeError(f"cannot compile {sentence!r}")
+
+    def entails(self, knowledge, query):
+        """
+        Return True if node `knowledge` entails node `query`.
+        """
+        return self.ite(knowledge, query, TRUE) == TRUE
+
+    def count(self, f):
+        """
+        Return the number of models of node `f` over every variable in the
+        order.
+        """
+        variables = len(self.order)
+        counts = {FALSE: 0, TRUE: 1}
+
+        def level(u):
+            return variables if u <= TRUE else self.level[u]
+
+        # Count both children of a node before the node itself
+        stack = [f]
+        while stack:
+            u = stack[-1]
+            if u in counts:
+                stack.pop()
+                continue
+            low, high = self.low[u], self.high[u]
+            if low not in counts or high not in counts:
+                stack.extend(child for child in (low, high)
+                             if child not in counts)
+                continue
+            stack.pop()
+            counts[u] = (
+                (counts[low] << (level(low) - level(u) - 1))
+                + (counts[high] << (level(high) - level(u) - 1))
+            )
+        return counts[f] << level(f)
+
+    def condition(self, f, name, value):
+        """
+        Return the node for `f` with the variable called `name` set to
+        `value`.
+        """
+        if name not in self.levels:
+            return f
+        target = self.levels[name]
+        results = dict()
+
+        def done(u):
+            if self.level[u] > target:
+                return u
+            if self.level[u] == target:
+                return self.high[u] if value else self.low[u]
+            return results.get(u)
+
+        # Condition both children of a node before the node itself
+        stack = [f]
+        while stack:
+            u = stack[-1]
+            if done(u) is not None:
+                stack.pop()
+                continue
+            low, high = done(self.low[u]), done(self.high[u])
+            if low is None or high is None:
+                stack.extend(child for child in (self.low[u], self.high[u])
+                             if done(child) is None)
+                continue
+            stack.pop()
+            results[u] = self.node(self.level[u], low, high)
+        return done(f)
+
+    def size(self, f):
+        """
+        Return the number of nodes reachable from `f`, terminals included.
+        """
+        seen = set()
+        stack = [f]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            if u > TRUE:
+                stack.extend([self.low[u], self.high[u]])
+        return len(seen)
+
+    def memory(self):
+        """
+        Return a dictionary of the number of nodes and cache entries, and
+        the bytes held by the node lists and tables, counting the keys,
+        values and items in them but not the compiled sentences.
+        """
+        containers = [self.level, self.low, self.high, self.unique,
+                      self.cache, self.compiled]
+        return {
+            "nodes": len(self.level),
+            "unique": len(self.unique),
+            "cache": len(self.cache),
+            "bytes": deep_size(containers) - sys.getsizeof(containers)
+        }
+
+    def clear_cache(self):
+        """
+        Drop the ite cache, keeping every node.
+        """
+        self.cache.clear()
+
+
+def deep_size(obj):
+    """
+    Return the bytes held by `obj` and the lists, tuples, sets, dicts and
+    numbers in it, counting every object once.
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if not isinstance(item, (int, float, dict, list, tuple, set,
+                                 frozenset)):
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+def variable_order(*sentences):
+    """
+    Return the names of the symbols in `sentences` in order of their first
+    appearance in a depth-first, left-to-right walk.
+    """
+    order = dict()
+    seen = set()
+    stack = list(reversed(sentences))
+    while stack:
+        sentence = stack.pop()
+        if isinstance(sentence, Symbol):
+            order.setdefault(sentence.name, len(order))
+        elif id(sentence) not in seen:
+            seen.add(id(sentence))
+            stack.extend(reversed(sentence.operands()))
+    return list(order)
+
+
+def bdd_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, with a BDD.
+    """
+    bdd = BDD(variable_order(knowledge, query))
+    return bdd.entails(bdd.compile(knowledge), bdd.compile(query))
+
+
+def main():
+    import puzzle
+
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    puzzles = [puzzle.knowledge0, puzzle.knowledge1,
+               puzzle.knowledge2, puzzle.knowledge3]
+
+    bdd = BDD(variable_order(*puzzles))
+    for i, knowledge in enumerate(puzzles):
+        start = time.perf_counter()
+        kb = bdd.compile(knowledge)
+        compiled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        answers = [bdd.entails(kb, bdd.compile(symbol)) for symbol in symbols]
+        queried = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = [model_check(knowledge, symbol) for symbol in symbols]
+        checked = time.perf_counter() - start
+
+        status = "same answers" if answers == expected else "ANSWERS DIFFER"
+        print(f"Puzzle {i}: {bdd.size(kb)} nodes, {bdd.count(kb)} models, "
+              f"compiled in {compiled * 1000:.2f}ms, "
+              f"queries {queried * 1000:.3f}ms, "
+              f"model_check {checked * 1000:.2f}ms ({status})")
+    print(f"Memory: {bdd.memory()}")
+
+
+if __name__ == "__main__":
+    main()
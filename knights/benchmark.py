@@ -0,0 +1,202 @@
+"""
+Compare every entailment backend on generated knowledge bases.
+
+For every instance from `generators.py`, each backend that accepts its
+number of symbols answers every query. The runner reports the time taken,
+the peak memory allocated while answering (measured in a second run under
+`tracemalloc`, and only in this process), and a count of the work done,
+which means something different for each backend:
+
+model_check: partial models visited
+compiled, parallel: models checked
+sat: decisions made by the solver
+bdd: nodes in the diagram
+
+Every backend must give the same answers as the first one to run, and the
+runner fails if any does not.
+
+The runner then builds each instance with plain constructors and through a
+`logic.SentenceFactory`, and reports the time taken and the memory the
+knowledge base holds once built.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import bdd
+import compiled
+import generators
+import logic
+import parallel
+import sat
+import truthtable
+
+# Instances as (name, generator, size)
+INSTANCES = [
+    ("knights 3", generators.knights_and_knaves, 3),
+    ("knights 6", generators.knights_and_knaves, 6),
+    ("knights 10", generators.knights_and_knaves, 10),
+    ("knights 20", generators.knights_and_knaves, 20),
+    ("3sat 10", generators.random_3sat, 10),
+    ("3sat 20", generators.random_3sat, 20),
+    ("3sat 50", generators.random_3sat, 50),
+    ("pigeonhole 3", generators.pigeonhole, 3),
+    ("pigeonhole 4", generators.pigeonhole, 4),
+    ("pigeonhole 6", generators.pigeonhole, 6)
+]
+
+
+def run_model_check(knowledge, query, stats):
+    result = dict()
+    answer = logic.model_check(knowledge, query, result)
+    stats["work"] = stats.get("work", 0) + result["nodes"]
+    return answer
+
+
+def run_compiled(knowledge, query, stats):
+    names = compiled.symbol_names(knowledge, query)
+    model = compiled.counter_model(knowledge, query, names)
+    checked = 2 ** len(names) if model is None else model + 1
+    stats["work"] = stats.get("work", 0) + checked
+    return model is None
+
+
+def run_truthtable(knowledge, query, stats):
+    return truthtable.truth_table_check(knowledge, query)
+
+
+def run_parallel(knowledge, query, stats):
+    result = dict()
+    answer = parallel.parallel_model_check(knowledge, query, stats=result)
+    stats["work"] = stats.get("work", 0) + result["models"]
+    return answer
+
+
+def run_sat(knowledge, query, stats):
+    result = dict()
+    answer = sat.sat_check(knowledge, query, result)
+    stats["work"] = stats.get("work", 0) + result["decisions"]
+    return answer
+
+
+def run_bdd(knowledge, query, stats):
+    manager = stats.get("manager")
+    if manager is None:
+        manager = bdd.BDD(bdd.variable_order(knowledge))
+        stats["manager"] = manager
+    answer = manager.entails(manager.compile(knowledge),
+                             manager.compile(query))
+    stats["work"] = len(manager)
+    return answer
+
+
+# Each backend as (name, function, largest number of symbols)
+BACKENDS = [
+    ("sat", run_sat, 1000),
+    ("bdd", run_bdd, 42),
+    ("truthtable", run_truthtable, 24),
+    ("compiled", run_compiled, 20),
+    ("parallel", run_parallel, 20),
+    ("model_check", run_model_check, 12)
+]
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python benchmark.py [seed]")
+    seed = int(sys.argv[1]) if len(sys.argv) == 2 else 0
+
+    print(f"{'instance':<14} {'symbols':>7}  {'backend':<12} {'seconds':>9}  "
+          f"{'peak KB':>9}  {'work':>9}")
+    failures = 0
+    for name, generator, size in INSTANCES:
+        if generator is generators.pigeonhole:
+            knowledge, queries = generator(size)
+        else:
+            knowledge, queries = generator(size, seed=seed)
+        symbols = len(compiled.symbol_names(knowledge, *queries))
+        for backend, seconds, peak, work, status in benchmark(
+            knowledge, queries
+        ):
+            flag = "" if status == "ok" else f"  {status}"
+            print(f"{name:<14} {symbols:>7}  {backend:<12} {seconds:>9.4f}  "
+                  f"{peak / 1024:>9.1f}  {work:>9}{flag}")
+            failures += status == "DISAGREES"
+
+    print(f"\n{'instance':<14} {'plain s':>9}  {'plain KB':>9}  "
+          f"{'factory s':>9}  {'factory KB':>10}")
+    for name, generator, size in INSTANCES:
+        seconds, size_plain = construction(generator, size, seed, False)
+        interned, size_interned = construction(generator, size, seed, True)
+        print(f"{name:<14} {seconds:>9.4f}  {size_plain / 1024:>9.1f}  "
+              f"{interned:>9.4f}  {size_interned / 1024:>10.1f}")
+    if failures:
+        sys.exit(f"{failures} backend results disagree")
+
+
+def benchmark(knowledge, queries, backends=BACKENDS):
+    """
+    Run every backend in `backends` that accepts the number of symbols in
+    `knowledge` and `queries`, returning a list of
+    `(backend, seconds, peak bytes, work, status)`.
+
+    `status` is "ok", or "DISAGREES" if the backend's answers differ from
+    those of the first backend run.
+    """
+    symbols = len(compiled.symbol_names(knowledge, *queries))
+    results = []
+    reference = None
+    for name, function, limit in backends:
+        if symbols > limit:
+            continue
+
+        # Time without tracing, then measure memory with it
+        stats = dict()
+        start = time.perf_counter()
+        answers = [function(knowledge, query, stats) for query in queries]
+        seconds = time.perf_counter() - start
+
+        compiled.cached_compile.cache_clear()
+        tracemalloc.start()
+        for query in queries:
+            function(knowledge, query, dict())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        if reference is None:
+            reference = answers
+        status = "ok" if answers == reference else "DISAGREES"
+        results.append((name, seconds, peak, stats.get("work", "-"), status))
+    return results
+
+
+def construction(generator, size, seed, interned):
+    """
+    Build an instance, through a new `logic.SentenceFactory` if `interned`,
+    returning the seconds taken and the bytes the instance holds once the
+    factory is gone, measured in a second build under `tracemalloc`.
+    """
+    def build():
+        factory = logic.SentenceFactory() if interned else None
+        if generator is generators.pigeonhole:
+            return generator(size, factory=factory)
+        return generator(size, seed=seed, factory=factory)
+
+    start = time.perf_counter()
+    build()
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    instance = build()
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instance
+    return seconds, held
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Conjunctive normal form for `logic.py` sentences by Tseitin encoding.
+
+Each compound subsentence gets a fresh variable together with clauses
+stating that the variable is equivalent to the subsentence, so the CNF
+grows linearly with the sentence instead of exponentially. Clauses are
+lists of non-zero integers in DIMACS style: variable `v` as `v`, its
+negation as `-v`.
+"""
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+
+class CNF():
+    """
+    A growing set of clauses, with the variable assigned to every symbol.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = dict()
+        self.names = dict()
+        self.count = 0
+        self.true = None
+
+        # Literal for each encoded sentence, by identity, keeping the
+        # sentence alive so its id is not reused
+        self.encoded = dict()
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def symbol(self, name):
+        """
+        Return the variable for the symbol called `name`.
+        """
+        if name not in self.variables:
+            variable = self.new_variable()
+            self.variables[name] = variable
+            self.names[variable] = name
+        return self.variables[name]
+
+    def constant(self, value):
+        """
+        Return a literal that is always `value`.
+        """
+        if self.true is None:
+            self.true = self.new_variable()
+            self.clauses.append([self.true])
+        return self.true if value else -self.true
+
+    def add(self, sentence):
+        """
+        Add clauses requiring `sentence` to be true.
+        """
+        # Conjunctions and clauses at the top need no new variables
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append([
+                self.literal(disjunct) for disjunct in sentence.disjuncts
+            ])
+        elif isinstance(sentence, Implication):
+            self.clauses.append([
+                -self.literal(sentence.antecedent),
+                self.literal(sentence.consequent)
+            ])
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """
+        Return a literal equivalent to `sentence`, adding the clauses that
+        define any new variables it needs.
+        """
+        if isinstance(sentence, Symbol):
+            return self.symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        key = id(sentence)
+        if key in self.encoded:
+            return self.encoded[key][1]
+
+        if isinstance(sentence, And):
+            literal = self.conjunction(
+                [self.literal(c) for c in sentence.conjuncts]
+            )
+        elif isinstance(sentence, Or):
+            literal = -self.conjunction(
+                [-self.literal(d) for d in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            literal = -self.conjunction([
+                self.literal(sentence.antecedent),
+                -self.literal(sentence.consequent)
+            ])
+        elif isinstance(sentence, Biconditional):
+            literal = self.equivalence(
+                self.literal(sentence.left), self.literal(sentence.right)
+            )
+        else:
+            raise TypeError(f"cannot encode {sentence!r}")
+
+        self.encoded[key] = (sentence, literal)
+        return literal
+
+    def conjunction(self, literals):
+        """
+        Return a new variable equivalent to the conjunction of `literals`.
+        """
+        if not literals:
+            return self.constant(True)
+        if len(literals) == 1:
+            return literals[0]
+        v = self.new_variable()
+        for literal in literals:
+            self.clauses.append([-v, literal])
+        self.clauses.append([v] + [-literal for literal in literals])
+        return v
+
+    def equivalence(self, a, b):
+        """
+        Return a new variable that is true exactly when `a` equals `b`.
+        """
+        v = self.new_variable()
+        self.clauses.append([-v, -a, b])
+        self.clauses.append([-v, a, -b])
+        self.clauses.append([v, a, b])
+        self.clauses.append([v, -a, -b])
+        return v
+
+
+def tseitin(sentence):
+    """
+    Return a `CNF` that is satisfiable exactly when `sentence` is.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    return cnf
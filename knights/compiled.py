@@ -0,0 +1,206 @@
+"""
+Sentences compiled to Python code over bit-indexed symbols.
+
+`model_check` in `logic.py` walks the sentence tree for every model, looks
+every symbol up in a dictionary, and copies the model twice per symbol on
+the way down. Here each symbol is given a bit of an integer model, the
+sentence is compiled into a Python function of that integer, and the
+models are enumerated by counting from 0 to 2^n - 1. There is no
+recursion over symbols, so no recursion limit, and no dictionaries.
+
+Compiled sentences are cached, so checking many queries against the same
+knowledge base compiles it only once. The cache is keyed on the sentence
+interned by a module `SentenceFactory`, which is built without recursion
+and hashed and compared in constant time, and which changes whenever the
+sentence is added to.
+
+Run `python compiled.py` to compare it with `model_check` on the puzzles.
+"""
+
+import functools
+import time
+
+from logic import (And, Biconditional, Implication, Not, Or, SentenceFactory,
+                   Symbol, model_check)
+
+# Nesting depth at which a subsentence is computed into a local variable
+# first, to stay within the limits of the Python parser
+MAX_DEPTH = 40
+
+# Interns sentences to key the compile cache
+FACTORY = SentenceFactory()
+
+
+class Compiler():
+    """
+    Generates Python source for sentences, given the bit of each symbol.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.assignments = []
+
+    def expression(self, sentence):
+        """
+        Return a Python expression over integer `m` that is truthy exactly
+        when `sentence` is true in the model `m`.
+
+        The tree is walked with an explicit stack, and subsentences nested
+        deeper than `MAX_DEPTH` are assigned to local variables in order,
+        so sentences of any depth can be compiled and evaluated.
+        """
+        results = dict()
+        stack = [(sentence, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in results:
+                continue
+            children = node.operands()
+            if not ready:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children)
+                continue
+
+            parts = [results[id(child)] for child in children]
+            code = self.combine(node, [part[0] for part in parts])
+            height = 1 + max((part[1] for part in parts), default=0)
+            if height > MAX_DEPTH:
+                code, height = self.local(code), 1
+            results[id(node)] = (code, height)
+        return results[id(sentence)][0]
+
+    def combine(self, sentence, codes):
+        """
+        Return the expression for `sentence`, given those of its operands.
+        """
+        if isinstance(sentence, Symbol):
+            try:
+                return f"(m & {1 << self.index[sentence.name]})"
+            except KeyError:
+                raise Exception(f"variable {sentence.name} not in model")
+        if isinstance(sentence, Not):
+            return f"(not {codes[0]})"
+        if isinstance(sentence, And):
+            return "(" + " and ".join(codes) + ")" if codes else "True"
+        if isinstance(sentence, Or):
+            return "(" + " or ".join(codes) + ")" if codes else "False"
+        if isinstance(sentence, Implication):
+            return f"(not {codes[0]} or {codes[1]})"
+        if isinstance(sentence, Biconditional):
+            return f"((not {codes[0]}) == (not {codes[1]}))"
+        raise TypeError(f"cannot compile {sentence!r}")
+
+    def local(self, code):
+        """
+        Assign expression `code` to a new local variable, after those
+        already assigned, and return its name.
+        """
+        name = f"v{len(self.assignments)}"
+        self.assignments.append(f"    {name} = {code}\n")
+        return name
+
+    def build(self, body):
+        """
+        Return a function of `m` that makes every assignment and returns
+        expression `body`.
+        """
+        namespace = dict()
+        exec("def evaluate(m):\n" + "".join(self.assignments)
+             + f"    return {body}\n", namespace)
+        return namespace["evaluate"]
+
+
+def symbol_names(*sentences):
+    """
+    Return a sorted tuple of the names of all symbols in `sentences`.
+
+    The sentences are walked with an explicit stack, stopping at interned
+    sentences, whose symbols are already known.
+    """
+    names = set()
+    seen = set()
+    stack = list(sentences)
+    while stack:
+        sentence = stack.pop()
+        if sentence._symbols is not None:
+            names.update(sentence._symbols)
+        elif isinstance(sentence, Symbol):
+            names.add(sentence.name)
+        elif id(sentence) not in seen:
+            seen.add(id(sentence))
+            stack.extend(sentence.operands())
+    return tuple(sorted(names))
+
+
+def compile_sentence(sentence, names=None):
+    """
+    Return a function of an integer model that returns a truthy value
+    exactly when `sentence` is true, where bit `i` of the model holds the
+    value of the symbol called `names[i]`.
+    """
+    if names is None:
+        names = symbol_names(sentence)
+    return cached_compile(FACTORY.intern(sentence), tuple(names))
+
+
+@functools.lru_cache(maxsize=256)
+def cached_compile(sentence, names):
+    compiler = Compiler({name: i for i, name in enumerate(names)})
+    return compiler.build(compiler.expression(sentence))
+
+
+def counter_model(knowledge, query, names, start=0, stop=None):
+    """
+    Return the first integer model in `range(start, stop)` where `knowledge`
+    is true and `query` is false, or None if there is no such model.
+    `stop` defaults to 2^len(names).
+    """
+    kb = compile_sentence(knowledge, names)
+    q = compile_sentence(query, names)
+    if stop is None:
+        stop = 1 << len(names)
+    for m in range(start, stop):
+        if kb(m) and not q(m):
+            return m
+    return None
+
+
+def compiled_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, with compiled sentences.
+    """
+    knowledge, query = FACTORY.intern(knowledge), FACTORY.intern(query)
+    names = symbol_names(knowledge, query)
+    return counter_model(knowledge, query, names) is None
+
+
+def main():
+    import puzzle
+
+    symbols = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+               puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+    puzzles = [puzzle.knowledge0, puzzle.knowledge1,
+               puzzle.knowledge2, puzzle.knowledge3]
+    repeat = 20
+
+    def measure(check, cold):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            if cold:
+                cached_compile.cache_clear()
+            answers = [check(knowledge, symbol)
+                       for knowledge in puzzles for symbol in symbols]
+        return answers, (time.perf_counter() - start) / repeat
+
+    expected, baseline = measure(model_check, False)
+    print(f"model_check: {baseline * 1000:.2f}ms for all puzzles")
+    for label, cold in [("compiling each knowledge base", True),
+                        ("with knowledge bases compiled", False)]:
+        answers, elapsed = measure(compiled_model_check, cold)
+        status = "same answers" if answers == expected else "ANSWERS DIFFER"
+        print(f"compiled_model_check, {label}: {elapsed * 1000:.2f}ms, "
+              f"speedup {baseline / elapsed:.1f}x ({status})")
+
+
+if __name__ == "__main__":
+    main()
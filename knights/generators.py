@@ -0,0 +1,158 @@
+"""
+Scalable knowledge bases built from `logic.py` sentences.
+
+Each generator returns `(knowledge, queries)`:
+
+knights_and_knaves: puzzles in the style of `puzzle.py` with any number of
+    inhabitants, each of whom makes one statement about the others. The
+    queries ask whether each inhabitant is a knight.
+random_3sat: random clauses of three literals at the ratio of clauses to
+    symbols where instances change from mostly satisfiable to mostly not,
+    and are hardest. The query is a contradiction, so it is entailed
+    exactly when the clauses are unsatisfiable.
+pigeonhole: `holes + 1` pigeons in `holes` holes, one pigeon to a hole,
+    which is unsatisfiable but hard to prove by resolution. The query is
+    again a contradiction.
+
+Every generator takes an optional `logic.SentenceFactory` to build the
+sentences through, which shares the literals and subformulas that repeat.
+"""
+
+import random
+import sys
+
+from logic import And, Biconditional, Implication, Not, Or, Symbol
+
+# Clauses per symbol at the 3-SAT phase transition
+PHASE_TRANSITION = 4.26
+
+
+def main():
+    if len(sys.argv) != 3 or sys.argv[1] not in GENERATORS:
+        sys.exit("Usage: python generators.py "
+                 f"[{'|'.join(GENERATORS)}] size")
+    knowledge, queries = GENERATORS[sys.argv[1]](int(sys.argv[2]))
+    print(knowledge.formula())
+    for query in queries:
+        print(f"? {query.formula()}")
+
+
+def knights_and_knaves(inhabitants, seed=None, factory=None):
+    """
+    Return a knights and knaves puzzle with `inhabitants` people, and the
+    query of whether each of them is a knight.
+
+    Who is a knight is chosen first, and every statement is made true or
+    false to match its speaker, so the puzzle always has a solution.
+    """
+    make = maker(factory)
+    rng = random.Random(seed)
+    names = [chr(ord("A") + i) if i < 26 else f"P{i}"
+             for i in range(inhabitants)]
+    knight = {name: make(Symbol, f"{name} is a Knight") for name in names}
+    knave = {name: make(Symbol, f"{name} is a Knave") for name in names}
+    truth = {name: rng.random() < 0.5 for name in names}
+
+    def kind(name, value):
+        return knight[name] if value else knave[name]
+
+    conjuncts = []
+    for name in names:
+
+        # Everyone is a knight or a knave, but not both
+        conjuncts.append(make(Or, knight[name], knave[name]))
+        conjuncts.append(make(Not, make(And, knight[name], knave[name])))
+
+    for speaker in names:
+        others = [name for name in names if name != speaker] or [speaker]
+        a, b = rng.choice(others), rng.choice(names)
+        form = rng.randrange(4)
+        if form == 0:
+            # "A is a knight", or "A is a knave"
+            statement = kind(a, rng.random() < 0.5)
+        elif form == 1:
+            # "A and B are of the same kind"
+            statement = make(Biconditional, knight[a], knight[b])
+        elif form == 2:
+            # "A is a knave or B is a knight"
+            statement = make(Or, knave[a], knight[b])
+        else:
+            # "If A is a knight, then B is a knave"
+            statement = make(Implication, knight[a], knave[b])
+
+        # Knights tell the truth and knaves lie
+        true = statement.evaluate({
+            symbol.name: truth[name] == (symbol is knight[name])
+            for name in names for symbol in [knight[name], knave[name]]
+        })
+        if true != truth[speaker]:
+            statement = make(Not, statement)
+        conjuncts.append(make(Implication, knight[speaker], statement))
+        conjuncts.append(make(Implication, knave[speaker],
+                              make(Not, statement)))
+
+    return make(And, *conjuncts), [knight[name] for name in names]
+
+
+def random_3sat(symbols, ratio=PHASE_TRANSITION, seed=None, factory=None):
+    """
+    Return `ratio * symbols` random clauses of three distinct symbols, each
+    negated with probability one half, and a contradiction as the query.
+    """
+    make = maker(factory)
+    rng = random.Random(seed)
+    variables = [make(Symbol, f"x{i}") for i in range(symbols)]
+    clauses = []
+    for _ in range(round(ratio * symbols)):
+        clauses.append(make(Or, *[
+            variable if rng.random() < 0.5 else make(Not, variable)
+            for variable in rng.sample(variables, 3)
+        ]))
+    return make(And, *clauses), [contradiction(variables[0], make)]
+
+
+def pigeonhole(holes, factory=None):
+    """
+    Return the statement that `holes + 1` pigeons sit in `holes` holes with
+    at most one pigeon in each, and a contradiction as the query.
+    """
+    make = maker(factory)
+    pigeons = holes + 1
+    sits = [[make(Symbol, f"p{p}h{h}") for h in range(holes)]
+            for p in range(pigeons)]
+
+    # Every pigeon sits in some hole
+    conjuncts = [make(Or, *sits[p]) for p in range(pigeons)]
+
+    # No two pigeons share a hole
+    for h in range(holes):
+        for p in range(pigeons):
+            for q in range(p + 1, pigeons):
+                conjuncts.append(make(Or, make(Not, sits[p][h]),
+                                      make(Not, sits[q][h])))
+    return make(And, *conjuncts), [contradiction(sits[0][0], make)]
+
+
+def contradiction(symbol, make):
+    return make(And, symbol, make(Not, symbol))
+
+
+def maker(factory):
+    """
+    Return a function that builds `kind(*operands)`, interned by `factory`
+    if it is not None.
+    """
+    if factory is not None:
+        return factory.make
+    return lambda kind, *operands: kind(*operands)
+
+
+GENERATORS = {
+    "knights": knights_and_knaves,
+    "3sat": random_3sat,
+    "pigeonhole": pigeonhole
+}
+
+
+if __name__ == "__main__":
+    main()
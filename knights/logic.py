@@ -1,19 +1,74 @@
 import itertools
+import weakref
 
 
 class Sentence():
 
+    # Interned sentences are shared by every equal sentence built by their
+    # SentenceFactory, and cannot change, so they cache their hash and
+    # symbols. Other sentences compute them on every call, since a
+    # conjunction anywhere inside them may be added to.
+    __slots__ = ("_hash", "_symbols", "_interned", "__weakref__")
+
+    def __init__(self):
+        self._hash = None
+        self._symbols = None
+        self._interned = None
+
+    def __reduce__(self):
+        return (type(self), tuple(self.operands()))
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence in a model that may leave symbols
+        unassigned, returning True, False, or None if the value depends on
+        the unassigned symbols.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
+    def operands(self):
+        """Returns the list of immediate subsentences."""
+        return []
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_set())
+
+    def symbol_set(self):
+        """Returns a frozenset of all symbols in the sentence."""
+        if self._symbols is not None:
+            return self._symbols
+        symbols = frozenset().union(
+            *[operand.symbol_set() for operand in self.operands()]
+        )
+        if self._interned is not None:
+            self._symbols = symbols
+        return symbols
+
+    def differs(self, other):
+        """
+        Returns True if `other` is known to be a different sentence without
+        comparing operands: another sentence interned by the same factory,
+        or one with a different cached hash.
+        """
+        if self._interned is not None and self._interned is other._interned:
+            return self is not other
+        return (self._hash is not None and other._hash is not None
+                and self._hash != other._hash)
+
+    def cache_hash(self, value):
+        """Returns hash `value`, caching it if the sentence is interned."""
+        if self._interned is not None:
+            self._hash = value
+        return value
 
     @classmethod
     def validate(cls, sentence):
@@ -43,15 +98,24 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        Sentence.__init__(self)
         self.name = name
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
+
+    def __reduce__(self):
+        return (Symbol, (self.name,))
 
     def __repr__(self):
         return self.name
@@ -62,23 +126,37 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        value = model.get(self.name)
+        return None if value is None else bool(value)
+
     def formula(self):
         return self.name
 
-    def symbols(self):
-        return {self.name}
+    def symbol_set(self):
+        if self._symbols is None:
+            self._symbols = frozenset([self.name])
+        return self._symbols
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        Sentence.__init__(self)
         Sentence.validate(operand)
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and not self.differs(other)
+            and self.operand == other.operand
+        )
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(("not", hash(self.operand))))
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,26 +164,38 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def operands(self):
+        return [self.operand]
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        Sentence.__init__(self)
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And) and not self.differs(other)
+            and self.conjuncts == other.conjuncts
+        )
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
             ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        ))
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -115,34 +205,54 @@ class And(Sentence):
 
     def add(self, conjunct):
         Sentence.validate(conjunct)
+        if self._interned is not None:
+            raise TypeError("cannot add to a shared (interned) conjunction")
         self.conjuncts.append(conjunct)
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def operands(self):
+        return self.conjuncts
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        Sentence.__init__(self)
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or) and not self.differs(other)
+            and self.disjuncts == other.disjuncts
+        )
 
     def __hash__(self):
-        return hash(
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
             ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        ))
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
@@ -151,30 +261,49 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def operands(self):
+        return self.disjuncts
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        Sentence.__init__(self)
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication) and not self.differs(other)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
+            ("implies", hash(self.antecedent), hash(self.consequent))
+        ))
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,29 +312,49 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def operands(self):
+        return [self.antecedent, self.consequent]
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        Sentence.__init__(self)
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional) and not self.differs(other)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is not None:
+            return self._hash
+        return self.cache_hash(hash(
+            ("biconditional", hash(self.left), hash(self.right))
+        ))
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,48 +365,186 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
-
+    def operands(self):
+        return [self.left, self.right]
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
+class SentenceFactory():
+    """
+    Builds hash-consed sentences: every equal sentence built by one factory
+    is the same object, which cannot change, so its hash and symbols are
+    computed once and two of them are equal only if they are the same
+    object. Interned conjunctions cannot be added to.
 
-        # If model has an assignment for each symbol
-        if not symbols:
+    Interning is slower than plain construction and does not save memory:
+    the cached symbol sets outweigh the sharing, even where every mention
+    of a symbol is a new object. It pays off when a sentence is hashed,
+    compared or asked for its symbols many times.
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
+    Sentences are held weakly, so they are freed once nothing else uses
+    them.
+    """
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
+    def __init__(self):
+        self.table = weakref.WeakValueDictionary()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+    def symbol(self, name):
+        return self.make(Symbol, name)
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    def make(self, kind, *operands):
+        """
+        Return the interned sentence `kind(*operands)`, where `kind` is a
+        `Sentence` class and `operands` its constructor arguments.
+        """
+        if kind is Symbol:
+            key = (Symbol, operands[0])
+        else:
+            operands = [
+                operand if operand._interned is self else self.intern(operand)
+                for operand in operands
+            ]
+            key = (kind,) + tuple(id(operand) for operand in operands)
+        sentence = self.table.get(key)
+        if sentence is None:
+            sentence = kind(*operands)
+            sentence._interned = self
+            hash(sentence)
+            sentence.symbol_set()
+            self.table[key] = sentence
+        return sentence
+
+    def intern(self, sentence):
+        """
+        Return the interned sentence equal to `sentence`.
+        """
+        if sentence._interned is self:
+            return sentence
+
+        # Intern operands before the sentences using them, without recursion
+        interned = dict()
+        stack = [(sentence, False)]
+        while stack:
+            node, ready = stack.pop()
+            if id(node) in interned:
+                continue
+            if not ready:
+                stack.append((node, True))
+                stack.extend((operand, False) for operand in node.operands()
+                             if operand._interned is not self)
+                continue
+            if isinstance(node, Symbol):
+                result = self.make(Symbol, node.name)
+            else:
+                result = self.make(type(node), *[
+                    operand if operand._interned is self
+                    else interned[id(operand)][1]
+                    for operand in node.operands()
+                ])
+            interned[id(node)] = (node, result)
+        return interned[id(sentence)][1]
+
+
+def model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query.
+
+    Branches are cut as soon as the partial model decides the answer. If
+    `stats` is a dictionary, the number of partial models visited is added
+    to its "nodes" entry and the number of branches cut to "pruned".
+    """
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    def check_all(knowledge, query, symbols, model):
+        """Checks if knowledge base entails query, given a particular model."""
+        if stats is not None:
+            stats["nodes"] = stats.get("nodes", 0) + 1
+
+        # If knowledge base is false, or query true, in every completion of
+        # the model, entailment holds; if knowledge base is true and query
+        # false in all of them, it does not
+        kb = knowledge.evaluate_partial(model)
+        q = None if kb is False else query.evaluate_partial(model)
+        if kb is False or q is True or (kb is True and q is False):
+            if stats is not None and symbols:
+                stats["pruned"] = stats.get("pruned", 0) + 1
+            return kb is False or q is True
+
+        # Otherwise some symbol is unassigned: choose one of them
+        remaining = symbols.copy()
+        p = remaining.pop()
+
+        # Create a model where the symbol is true
+        model_true = model.copy()
+        model_true[p] = True
+
+        # Create a model where the symbol is false
+        model_false = model.copy()
+        model_false[p] = False
+
+        # Ensure entailment holds in both models
+        return (check_all(knowledge, query, remaining, model_true) and
+                check_all(knowledge, query, remaining, model_false))
 
     # Get all symbols in both knowledge and query
     symbols = set.union(knowledge.symbols(), query.symbols())
 
     # Check that knowledge entails query
     return check_all(knowledge, query, symbols, dict())
+
+
+def model_check_many(knowledge, queries):
+    """
+    Checks every query against the knowledge base, enumerating the models
+    of the knowledge base once.
+
+    Returns a list with, for each query, "entailed" if it is true in every
+    model of the knowledge base, "refuted" if it is false in every one, and
+    "unknown" otherwise. If the knowledge base has no models, every query
+    is entailed, as with model_check.
+    """
+    queries = list(queries)
+    symbols = sorted(knowledge.symbol_set().union(
+        *[query.symbol_set() for query in queries]
+    ))
+
+    # Whether each query has been seen true, and seen false, in some model
+    seen_true = [False] * len(queries)
+    seen_false = [False] * len(queries)
+    undecided = list(range(len(queries)))
+
+    for values in itertools.product([True, False], repeat=len(symbols)):
+        model = dict(zip(symbols, values))
+        if not knowledge.evaluate(model):
+            continue
+        for i in undecided:
+            if queries[i].evaluate(model):
+                seen_true[i] = True
+            else:
+                seen_false[i] = True
+
+        # Stop once every query is known to be undecided by the knowledge
+        undecided = [
+            i for i in undecided if not (seen_true[i] and seen_false[i])
+        ]
+        if not undecided:
+            break
+
+    return [
+        "refuted" if seen_false[i] and not seen_true[i]
+        else "unknown" if seen_false[i]
+        else "entailed"
+        for i in range(len(queries))
+    ]
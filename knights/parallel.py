@@ -0,0 +1,161 @@
+"""
+Model checking over several processes.
+
+The 2^n models of n symbols are numbered as in `compiled.py`, so fixing the
+values of the highest k symbols picks out a contiguous range of 2^(n-k)
+models. Each of the 2^k prefixes is a task for a process pool. Every
+worker compiles the sentences once, checks its range in blocks, and stops
+between blocks once any worker has found a counter-model, at which point
+tasks not yet started are cancelled.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from compiled import counter_model, symbol_names
+from logic import And, Implication, Symbol
+
+# Symbols fixed by each task, at most
+PREFIX_BITS = 8
+
+# Models checked between looks at the cancellation flag
+BLOCK = 1 << 14
+
+# Sentences, symbol names and cancellation flag of the worker's problem
+problem = None
+
+
+def main():
+    if len(sys.argv) not in [1, 2, 3]:
+        sys.exit("Usage: python parallel.py [symbols] [workers]")
+    count = int(sys.argv[1]) if len(sys.argv) >= 2 else 20
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else os.cpu_count()
+
+    # A chain of implications entails its ends, but not the reverse
+    symbols = [Symbol(f"S{i}") for i in range(count)]
+    knowledge = And(*[
+        Implication(symbols[i], symbols[i + 1]) for i in range(count - 1)
+    ])
+    queries = [("entailed", Implication(symbols[0], symbols[-1])),
+               ("not entailed", Implication(symbols[-1], symbols[0]))]
+
+    print(f"{count} symbols, {2 ** count} models")
+    for label, query in queries:
+        for n in sorted({1, workers}):
+            stats = dict()
+            answer = parallel_model_check(knowledge, query, n, stats=stats)
+            print(f"{label}, {n} workers: {answer}, "
+                  f"{stats['models']} models in {stats['seconds']:.3f}s, "
+                  f"{stats['models per second']:,.0f} models/s")
+
+
+def parallel_model_check(knowledge, query, workers=None,
+                         prefix_bits=PREFIX_BITS, stats=None):
+    """
+    Checks if knowledge base entails query, on `workers` processes (by
+    default, one for each CPU).
+
+    If `stats` is a dictionary, it is given the number of models checked,
+    the seconds taken, the models per second and, if the query is not
+    entailed, a counter-model as a dictionary from names to values.
+    """
+    if workers is None:
+        workers = os.cpu_count()
+    names = symbol_names(knowledge, query)
+    start = time.perf_counter()
+
+    # Contiguous ranges of models sharing their highest symbols
+    bits = min(prefix_bits, len(names))
+    size = 1 << (len(names) - bits)
+    ranges = [(i * size, (i + 1) * size) for i in range(1 << bits)]
+
+    if workers > 1 and len(ranges) > 1:
+        model, checked = check_in_pool(knowledge, query, names, ranges,
+                                       workers)
+    else:
+        found = multiprocessing.Event()
+        model, checked = None, 0
+        for low, high in ranges:
+            model, models = check_range(
+                (knowledge, query, names, found), low, high
+            )
+            checked += models
+            if model is not None:
+                break
+
+    if stats is not None:
+        seconds = time.perf_counter() - start
+        stats["models"] = checked
+        stats["seconds"] = seconds
+        stats["models per second"] = checked / seconds if seconds else 0.0
+        if model is not None:
+            stats["counter model"] = {
+                name: bool(model >> i & 1) for i, name in enumerate(names)
+            }
+    return model is None
+
+
+def check_in_pool(knowledge, query, names, ranges, workers):
+    """
+    Check `ranges` on a pool of `workers` processes, returning the first
+    counter-model found, or None, and the number of models checked.
+    """
+    found = multiprocessing.Event()
+    model, checked = None, 0
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=start_worker,
+        initargs=(knowledge, query, names, found)
+    ) as executor:
+        pending = {executor.submit(check_prefix, low, high)
+                   for low, high in ranges}
+        while pending and model is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result, models = future.result()
+                checked += models
+                if result is not None and model is None:
+                    model = result
+
+        # Cancel the tasks not yet started, and count the running ones
+        for future in pending:
+            future.cancel()
+        for future in pending:
+            if not future.cancelled():
+                checked += future.result()[1]
+    return model, checked
+
+
+def start_worker(knowledge, query, names, found):
+    global problem
+    problem = (knowledge, query, names, found)
+
+
+def check_prefix(low, high):
+    return check_range(problem, low, high)
+
+
+def check_range(problem, low, high):
+    """
+    Return the first counter-model in `range(low, high)`, or None, and the
+    number of models checked, stopping early if another worker sets the
+    problem's flag.
+    """
+    knowledge, query, names, found = problem
+    checked = 0
+    for start in range(low, high, BLOCK):
+        if found.is_set():
+            break
+        stop = min(start + BLOCK, high)
+        model = counter_model(knowledge, query, names, start, stop)
+        if model is not None:
+            found.set()
+            return model, checked + model - start + 1
+        checked += stop - start
+    return None, checked
+
+
+if __name__ == "__main__":
+    main()
@@ -77,8 +77,9 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
-            for symbol in symbols:
-                if model_check(knowledge, symbol):
+            answers = model_check_many(knowledge, symbols)
+            for symbol, answer in zip(symbols, answers):
+                if answer == "entailed":
                     print(f"    {symbol}")
 
 
@@ -0,0 +1,376 @@
+"""
+A CDCL SAT solver, and entailment checking with it.
+
+`model_check` in `logic.py` enumerates all 2^n models. Here the knowledge
+base and the negated query are compiled to CNF by `cnf.py`, and the solver
+searches for a model of both: the knowledge base entails the query exactly
+when there is none.
+
+The solver uses two watched literals per clause for unit propagation,
+learns a first-UIP clause from every conflict and jumps back to the
+second-highest level in it, picks decision variables by VSIDS activity
+with phase saving, and restarts on the Luby sequence.
+"""
+
+import heapq
+
+from cnf import CNF
+from logic import Not
+
+# Conflicts before the first restart, scaled by the Luby sequence
+RESTART_BASE = 100
+
+# Factor by which variable activity bumps grow after each conflict
+ACTIVITY_DECAY = 0.95
+
+
+def sat_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query, using a SAT solver.
+
+    If `stats` is a dictionary, the solver's counts are added to it.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    solver = Solver(cnf.count, cnf.clauses)
+    entailed = not solver.solve()
+    if stats is not None:
+        for key, value in solver.stats.items():
+            stats[key] = stats.get(key, 0) + value
+    return entailed
+
+
+def satisfiable(sentence):
+    """
+    Return a model of `sentence`, as a dictionary from symbol names to
+    truth values, or None if it has no model.
+    """
+    cnf = CNF()
+    cnf.add(sentence)
+    solver = Solver(cnf.count, cnf.clauses)
+    if not solver.solve():
+        return None
+    return {
+        name: solver.value(variable) is True
+        for name, variable in cnf.variables.items()
+    }
+
+
+def luby(i):
+    """
+    Return the `i`-th element (from 0) of the Luby sequence 1 1 2 1 1 2 4 ...
+    """
+    size, power = 1, 0
+    while size < i + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        power -= 1
+        i = i % size
+    return 1 << power
+
+
+class Solver():
+    """
+    CDCL solver over variables 1..`count` and DIMACS-style clauses.
+
+    Clauses can be added between calls to `solve`, and `solve` accepts
+    assumption literals that hold for that call only.
+    """
+
+    def __init__(self, count=0, clauses=()):
+        self.count = 0
+        self.assigns = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.polarity = [False]
+        self.activity = [0.0]
+        self.watches = {}
+        self.clauses = []
+        self.learned = []
+        self.trail = []
+        self.limits = []
+        self.head = 0
+        self.increment = 1.0
+        self.heap = []
+        self.inconsistent = False
+        self.stats = {
+            "decisions": 0, "propagations": 0, "conflicts": 0,
+            "learned": 0, "restarts": 0
+        }
+        self.ensure(count)
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def ensure(self, count):
+        """
+        Make variables up to `count` available.
+        """
+        while self.count < count:
+            self.count += 1
+            v = self.count
+            self.assigns.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.polarity.append(False)
+            self.activity.append(0.0)
+            self.watches[v] = []
+            self.watches[-v] = []
+            heapq.heappush(self.heap, (0.0, v))
+
+    def value(self, literal):
+        """
+        Return the value of `literal` as True, False or None if unassigned.
+        """
+        a = self.assigns[abs(literal)]
+        if a == 0:
+            return None
+        return (a > 0) == (literal > 0)
+
+    def level(self):
+        return len(self.limits)
+
+    def add_clause(self, literals):
+        """
+        Add a clause. Must be called at decision level 0.
+        """
+        if self.inconsistent:
+            return
+        self.backtrack(0)
+        self.ensure(max((abs(literal) for literal in literals), default=0))
+
+        # Drop duplicate and false literals, and skip satisfied clauses
+        clause = []
+        for literal in literals:
+            value = self.value(literal)
+            if value is True or -literal in clause:
+                return
+            if value is None and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.inconsistent = True
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.inconsistent = True
+        else:
+            self.clauses.append(clause)
+            self.watches[-clause[0]].append(clause)
+            self.watches[-clause[1]].append(clause)
+
+    def assign(self, literal, reason):
+        v = abs(literal)
+        self.assigns[v] = 1 if literal > 0 else -1
+        self.levels[v] = self.level()
+        self.reasons[v] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Propagate unit clauses from the trail, returning a conflicting
+        clause or None.
+
+        The clauses watching literal `p` are kept in `watches[-p]`, so when
+        a literal on the trail becomes true, the clauses whose watched
+        literal just became false are found under it.
+        """
+        assigns = self.assigns
+        while self.head < len(self.trail):
+            true = self.trail[self.head]
+            self.head += 1
+            self.stats["propagations"] += 1
+            false = -true
+            watching = self.watches[true]
+            kept = []
+            conflict = None
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+                i += 1
+
+                # Make sure the false literal is clause[1]
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                value = assigns[first] if first > 0 else -assigns[-first]
+                if value > 0:
+                    kept.append(clause)
+                    continue
+
+                # Look for a new literal to watch
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (assigns[literal] if literal > 0 else -assigns[-literal]) >= 0:
+                        clause[1], clause[k] = literal, false
+                        self.watches[-literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if value < 0:
+                        conflict = clause
+                        kept.extend(watching[i:])
+                        break
+                    self.assign(first, clause)
+            self.watches[true] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Return the first-UIP clause learned from `conflict`, with the
+        asserting literal first, and the level to jump back to.
+        """
+        seen = set()
+        learned = [None]
+        pending = 0
+        index = len(self.trail) - 1
+        clause = conflict
+        literal = None
+        while True:
+            for q in clause:
+                if literal is not None and q == literal:
+                    continue
+                v = abs(q)
+                if v in seen or self.levels[v] == 0:
+                    continue
+                seen.add(v)
+                self.bump(v)
+                if self.levels[v] == self.level():
+                    pending += 1
+                else:
+                    learned.append(q)
+
+            # Walk back to the next literal of this level in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reasons[abs(literal)]
+            pending -= 1
+            if pending == 0:
+                break
+        learned[0] = -literal
+
+        if len(learned) == 1:
+            return learned, 0
+        # Watch the literal of the highest remaining level second
+        best = max(range(1, len(learned)),
+                   key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[best] = learned[best], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, v):
+        self.activity[v] += self.increment
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.increment *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, self.count + 1)
+                         if self.assigns[u] == 0]
+            heapq.heapify(self.heap)
+        elif self.assigns[v] == 0:
+            heapq.heappush(self.heap, (-self.activity[v], v))
+
+    def backtrack(self, level):
+        """
+        Undo every assignment above decision `level`.
+        """
+        if self.level() <= level:
+            return
+        limit = self.limits[level]
+        for literal in self.trail[limit:]:
+            v = abs(literal)
+            self.polarity[v] = literal > 0
+            self.assigns[v] = 0
+            self.reasons[v] = None
+            heapq.heappush(self.heap, (-self.activity[v], v))
+        del self.trail[limit:]
+        del self.limits[level:]
+        self.head = len(self.trail)
+
+    def decide(self):
+        """
+        Return the unassigned variable with the highest activity, or None.
+        """
+        if len(self.heap) > 4 * self.count + 100:
+            self.heap = [(-self.activity[v], v) for v in range(1, self.count + 1)
+                         if self.assigns[v] == 0]
+            heapq.heapify(self.heap)
+        while self.heap:
+            _, v = heapq.heappop(self.heap)
+            if self.assigns[v] == 0:
+                return v
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        Return True if the clauses, together with every literal in
+        `assumptions`, are satisfiable, and False otherwise. After True,
+        `value` gives the model.
+
+        Assumptions are made as the first decisions, so a conflict can
+        jump back below them and they are simply assumed again.
+        """
+        if self.inconsistent:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            self.ensure(abs(literal))
+
+        restarts = 0
+        budget = RESTART_BASE * luby(0)
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.stats["conflicts"] += 1
+                conflicts += 1
+                if self.level() == 0:
+                    self.inconsistent = True
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learn(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= ACTIVITY_DECAY
+                continue
+
+            # Restart on the Luby schedule, keeping learned clauses
+            if conflicts >= budget:
+                restarts += 1
+                self.stats["restarts"] += 1
+                budget = RESTART_BASE * luby(restarts)
+                conflicts = 0
+                self.backtrack(0)
+                continue
+
+            # Make the next assumption, or decide a new variable
+            if self.level() < len(assumptions):
+                literal = assumptions[self.level()]
+                value = self.value(literal)
+                if value is False:
+                    self.backtrack(0)
+                    return False
+                self.limits.append(len(self.trail))
+                if value is None:
+                    self.assign(literal, None)
+                continue
+
+            v = self.decide()
+            if v is None:
+                return True
+            self.stats["decisions"] += 1
+            self.limits.append(len(self.trail))
+            self.assign(v if self.polarity[v] else -v, None)
+
+    def learn(self, clause):
+        self.stats["learned"] += 1
+        self.learned.append(clause)
+        self.watches[-clause[0]].append(clause)
+        self.watches[-clause[1]].append(clause)
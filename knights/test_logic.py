@@ -0,0 +1,246 @@
+import sys
+
+from logic import *
+import bdd
+import benchmark
+import compiled
+import generators
+import parallel
+import puzzle
+import sat
+import truthtable
+
+SYMBOLS = [puzzle.AKnight, puzzle.AKnave, puzzle.BKnight,
+           puzzle.BKnave, puzzle.CKnight, puzzle.CKnave]
+PUZZLES = [puzzle.knowledge0, puzzle.knowledge1,
+           puzzle.knowledge2, puzzle.knowledge3]
+
+
+def test_sat_check():
+    """sat_check gives the same answers as model_check on the puzzles"""
+    for knowledge in PUZZLES:
+        for symbol in SYMBOLS:
+            assert sat.sat_check(knowledge, symbol) == model_check(knowledge, symbol)
+
+
+def test_satisfiable():
+    """satisfiable returns a model, or None for a contradiction"""
+    P, Q = Symbol("P"), Symbol("Q")
+    model = sat.satisfiable(And(Implication(P, Q), P))
+    assert model == {"P": True, "Q": True}
+    assert sat.satisfiable(And(Biconditional(P, Q), P, Not(Q))) is None
+
+
+def test_solver_assumptions():
+    """Solver answers under assumptions without keeping them"""
+    solver = sat.Solver(3, [[1, 2], [-1, 3], [-2, 3]])
+    assert not solver.solve([-3])
+    assert solver.solve()
+    assert solver.value(3)
+
+
+def test_compiled_model_check():
+    """compiled_model_check gives the same answers as model_check"""
+    for knowledge in PUZZLES:
+        for symbol in SYMBOLS:
+            assert (compiled.compiled_model_check(knowledge, symbol)
+                    == model_check(knowledge, symbol))
+
+    # Sentences nested deeper than MAX_DEPTH, and than the recursion limit,
+    # are split into local variables
+    P, Q = Symbol("P"), Symbol("Q")
+    for depth in [3 * compiled.MAX_DEPTH, sys.getrecursionlimit()]:
+        sentence = P
+        for _ in range(depth):
+            sentence = Not(Or(sentence, Q))
+        assert compiled.compiled_model_check(sentence, And(P, Not(Q)))
+        assert not compiled.compiled_model_check(sentence, Not(P))
+        assert truthtable.truth_table_check(sentence, And(P, Not(Q)))
+        assert not truthtable.truth_table_check(sentence, Not(P))
+
+
+def test_truth_table_check():
+    """truth_table_check agrees with model_check, across chunk sizes"""
+    for chunk_bits in [3, 6, truthtable.CHUNK_BITS]:
+        for knowledge in PUZZLES:
+            for symbol in SYMBOLS:
+                assert (truthtable.truth_table_check(knowledge, symbol, chunk_bits)
+                        == model_check(knowledge, symbol))
+        assert truthtable.count_models(puzzle.knowledge3, chunk_bits=chunk_bits) == 1
+
+
+def test_sentence_factory():
+    """Equal interned sentences are shared and cannot be added to"""
+    factory = SentenceFactory()
+    A, B = factory.symbol("A"), factory.symbol("B")
+    sentence = factory.make(And, A, Not(B))
+    assert factory.intern(And(Symbol("A"), Not(Symbol("B")))) is sentence
+    assert sentence.conjuncts[1] is factory.make(Not, B)
+    assert sentence.symbols() == {"A", "B"}
+    assert sentence == And(Symbol("A"), Not(Symbol("B")))
+    assert sentence != factory.make(And, A, B)
+    try:
+        sentence.add(Symbol("C"))
+        assert False, "interned conjunction changed"
+    except TypeError:
+        pass
+
+    # Adding to a conjunction that is not interned updates its caches
+    knowledge = And(Symbol("A"))
+    knowledge.symbols()
+    knowledge.add(Symbol("C"))
+    assert knowledge.symbols() == {"A", "C"}
+    assert knowledge == And(Symbol("A"), Symbol("C"))
+
+
+def test_nested_add():
+    """Adding to a conjunction inside another one changes the outer one"""
+    A, B, C = Symbol("A"), Symbol("B"), Symbol("C")
+    inner = And(Or(A, B))
+    outer = And(inner)
+    outer.symbols()
+    assert not compiled.compiled_model_check(outer, A)
+    inner.add(Or(C, A))
+    assert outer.symbols() == {"A", "B", "C"}
+    assert outer == And(And(Or(A, B), Or(C, A)))
+    assert not model_check(outer, A)
+    inner.add(Not(B))
+    assert model_check(outer, A)
+    assert compiled.compiled_model_check(outer, A)
+
+
+def test_model_check_many():
+    """model_check_many classifies queries as model_check would"""
+    for knowledge in PUZZLES:
+        answers = model_check_many(knowledge, SYMBOLS)
+        for symbol, answer in zip(SYMBOLS, answers):
+            assert (answer == "entailed") == model_check(knowledge, symbol)
+            assert (answer == "refuted") == model_check(knowledge, Not(symbol))
+    P, Q = Symbol("P"), Symbol("Q")
+    assert model_check_many(P, [P, Not(P), Q]) == ["entailed", "refuted", "unknown"]
+    assert model_check_many(And(P, Not(P)), [Q]) == ["entailed"]
+
+
+def test_evaluate_partial():
+    """evaluate_partial is None only when unassigned symbols matter"""
+    P, Q = Symbol("P"), Symbol("Q")
+    assert And(P, Q).evaluate_partial({"P": False}) is False
+    assert And(P, Q).evaluate_partial({"P": True}) is None
+    assert Or(P, Q).evaluate_partial({"Q": True}) is True
+    assert Implication(P, Q).evaluate_partial({"P": False}) is True
+    assert Biconditional(P, Q).evaluate_partial({"P": True}) is None
+    assert Not(P).evaluate_partial({"P": True}) is False
+
+
+def test_model_check_pruning():
+    """model_check visits fewer partial models than full enumeration"""
+    stats = dict()
+    for knowledge in PUZZLES:
+        for symbol in SYMBOLS:
+            assert (model_check(knowledge, symbol, stats)
+                    == sat.sat_check(knowledge, symbol))
+    full = sum(
+        2 ** (len(knowledge.symbols() | symbol.symbols()) + 1) - 1
+        for knowledge in PUZZLES for symbol in SYMBOLS
+    )
+    assert 0 < stats["nodes"] < full
+    assert stats["pruned"] > 0
+
+
+def test_bdd():
+    """BDDs answer, count and condition the puzzles like model_check"""
+    manager = bdd.BDD(bdd.variable_order(*PUZZLES))
+    for knowledge in PUZZLES:
+        kb = manager.compile(knowledge)
+        for symbol in SYMBOLS:
+            assert (manager.entails(kb, manager.compile(symbol))
+                    == model_check(knowledge, symbol))
+    kb = manager.compile(puzzle.knowledge3)
+    assert manager.count(kb) == 1
+    assert manager.condition(kb, puzzle.AKnight.name, False) == bdd.FALSE
+    assert manager.count(manager.condition(kb, puzzle.AKnight.name, True)) == 2
+
+
+def test_bdd_changes():
+    """BDDs follow knowledge added after compiling, and deep diagrams"""
+    A, B = Symbol("A"), Symbol("B")
+    manager = bdd.BDD()
+    knowledge = And(Implication(A, B))
+    assert not manager.entails(manager.compile(knowledge), manager.compile(B))
+    knowledge.add(A)
+    assert manager.entails(manager.compile(knowledge), manager.compile(B))
+
+    # Interned sentences are compiled once
+    factory = SentenceFactory()
+    sentence = factory.make(Or, factory.symbol("A"), factory.symbol("C"))
+    u = manager.compile(sentence)
+    nodes = len(manager)
+    assert manager.compile(factory.intern(Or(A, Symbol("C")))) == u
+    assert len(manager) == nodes
+
+    # The conjunction of more variables than the recursion limit
+    chain = bdd.BDD([f"x{i}" for i in range(5000)])
+    u = bdd.TRUE
+    for level in reversed(range(5000)):
+        u = chain.node(level, bdd.FALSE, u)
+    assert chain.count(u) == 1
+    assert chain.count(chain.condition(u, "x0", True)) == 2
+    assert chain.condition(u, "x4999", False) == bdd.FALSE
+    assert chain.memory()["bytes"] > 0
+
+
+def test_parallel_model_check():
+    """parallel_model_check agrees with model_check on one or two workers"""
+    for workers in [1, 2]:
+        for knowledge in [puzzle.knowledge1, puzzle.knowledge3]:
+            for symbol in SYMBOLS:
+                stats = dict()
+                answer = parallel.parallel_model_check(
+                    knowledge, symbol, workers, prefix_bits=2, stats=stats
+                )
+                assert answer == model_check(knowledge, symbol)
+                if not answer:
+                    model = stats["counter model"]
+                    assert knowledge.evaluate(model)
+                    assert not symbol.evaluate(model)
+
+
+def test_generators():
+    """Generated puzzles are solvable and every backend agrees on them"""
+    knowledge, queries = generators.knights_and_knaves(4, seed=1)
+    assert sat.satisfiable(knowledge)
+    assert any(model_check(knowledge, query) or
+               model_check(knowledge, Not(query)) for query in queries)
+    knowledge, queries = generators.pigeonhole(2)
+    assert all(model_check(knowledge, query) for query in queries)
+    knowledge, queries = generators.random_3sat(8, seed=1)
+    assert len(knowledge.conjuncts) == round(8 * generators.PHASE_TRANSITION)
+    interned, _ = generators.random_3sat(8, seed=1, factory=SentenceFactory())
+    assert interned == knowledge and interned._interned is not None
+    for knowledge, queries in [generators.knights_and_knaves(3, seed=2),
+                               generators.pigeonhole(2)]:
+        results = benchmark.benchmark(knowledge, queries)
+        assert len(results) == len(benchmark.BACKENDS)
+        assert all(status == "ok" for *_, status in results)
+
+
+def main():
+    test_sat_check()
+    test_satisfiable()
+    test_solver_assumptions()
+    test_compiled_model_check()
+    test_truth_table_check()
+    test_sentence_factory()
+    test_nested_add()
+    test_model_check_many()
+    test_evaluate_partial()
+    test_model_check_pruning()
+    test_bdd()
+    test_bdd_changes()
+    test_parallel_model_check()
+    test_generators()
+    print("logic tests passed")
+
+
+if __name__ == "__main__":
+    main()
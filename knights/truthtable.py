@@ -0,0 +1,184 @@
+"""
+Entailment by truth tables evaluated 64 models at a time with NumPy.
+
+Symbol `i` is given a packed bit vector over all 2^n models, with bit `m`
+set exactly when the symbol is true in model `m`. A sentence is then
+evaluated once for every model with bitwise operations on those vectors,
+and the knowledge base entails the query exactly when `KB & ~query` is
+zero everywhere.
+
+The models are split into chunks of 2^`CHUNK_BITS`, so memory stays
+bounded however many symbols there are, and the check stops at the first
+chunk holding a counter-model.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from compiled import compiled_model_check, symbol_names
+from logic import And, Biconditional, Implication, Not, Or, Symbol, model_check
+
+# Models in each chunk are 2^CHUNK_BITS, stored as 2^(CHUNK_BITS - 6) words
+CHUNK_BITS = 20
+
+ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# Value of symbol `i` < 6 in the 64 models of one word
+PATTERNS = [
+    0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+    0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000
+]
+
+
+def main():
+    if len(sys.argv) not in [1, 2]:
+        sys.exit("Usage: python truthtable.py [symbols]")
+    count = int(sys.argv[1]) if len(sys.argv) == 2 else 16
+
+    # A chain of implications entails its ends, and every model is checked
+    symbols = [Symbol(f"S{i}") for i in range(count)]
+    knowledge = And(*[
+        Implication(symbols[i], symbols[i + 1]) for i in range(count - 1)
+    ])
+    query = Implication(symbols[0], symbols[-1])
+
+    checks = [("truth_table_check", truth_table_check),
+              ("compiled_model_check", compiled_model_check)]
+    if count <= 14:
+        checks.append(("model_check", model_check))
+    print(f"{count} symbols, {2 ** count} models")
+    for name, check in checks:
+        start = time.perf_counter()
+        answer = check(knowledge, query)
+        elapsed = time.perf_counter() - start
+        print(f"{name}: {answer} in {elapsed * 1000:.2f}ms")
+
+
+def truth_table_check(knowledge, query, chunk_bits=CHUNK_BITS):
+    """
+    Checks if knowledge base entails query, with bit-parallel truth tables.
+    """
+    names = symbol_names(knowledge, query)
+    for vectors, valid in chunks(len(names), chunk_bits):
+        kb = evaluate(knowledge, names, vectors)
+        q = evaluate(query, names, vectors)
+        if np.any(kb & ~q & valid):
+            return False
+    return True
+
+
+def count_models(sentence, names=None, chunk_bits=CHUNK_BITS):
+    """
+    Return the number of models over `names` (by default, the symbols of
+    `sentence`) in which `sentence` is true.
+    """
+    if names is None:
+        names = symbol_names(sentence)
+    total = 0
+    for vectors, valid in chunks(len(names), chunk_bits):
+        words = evaluate(sentence, names, vectors) & valid
+        total += int(np.unpackbits(words.view(np.uint8)).sum())
+    return total
+
+
+def chunks(count, chunk_bits=CHUNK_BITS):
+    """
+    Yield `(vectors, valid)` for each chunk of the models of `count`
+    symbols, where `vectors[i]` is the bit vector of symbol `i` over the
+    chunk and `valid` masks the bits that are models at all.
+    """
+    low = min(count, chunk_bits)
+    words = 1 << max(low - 6, 0)
+
+    # Symbols below the chunk size follow the same pattern in every chunk
+    index = np.arange(words, dtype=np.uint64)
+    vectors = []
+    for i in range(low):
+        if i < 6:
+            vectors.append(np.full(words, PATTERNS[i], dtype=np.uint64))
+        else:
+            bit = (index >> np.uint64(i - 6)) & np.uint64(1)
+            vectors.append(np.where(bit == 1, ONES, np.uint64(0)))
+    if low < 6:
+        valid = np.uint64((1 << (1 << low)) - 1)
+    else:
+        valid = ONES
+
+    # Higher symbols are constant over a chunk
+    ones = np.full(words, ONES)
+    zeros = np.zeros(words, dtype=np.uint64)
+    for chunk in range(1 << (count - low)):
+        high = [ones if chunk >> j & 1 else zeros for j in range(count - low)]
+        yield vectors + high, valid
+
+
+def evaluate(sentence, names, vectors):
+    """
+    Return the bit vector of the models in which `sentence` is true, given
+    the bit vector of the symbol called `names[i]` as `vectors[i]`.
+
+    The tree is walked with an explicit stack, and each subsentence's
+    vector is dropped as soon as every sentence using it is evaluated.
+    """
+    index = {name: i for i, name in enumerate(names)}
+
+    # Order the distinct subsentences so operands come first
+    order = []
+    uses = dict()
+    stack = [(sentence, False)]
+    while stack:
+        node, ready = stack.pop()
+        if ready:
+            order.append(node)
+            continue
+        uses[id(node)] = uses.get(id(node), 0) + 1
+        if uses[id(node)] == 1:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.operands())
+
+    results = dict()
+    for node in order:
+        parts = []
+        for child in node.operands():
+            parts.append(results[id(child)])
+            uses[id(child)] -= 1
+            if uses[id(child)] == 0:
+                del results[id(child)]
+        results[id(node)] = combine(node, parts, index, vectors)
+    return results[id(sentence)]
+
+
+def combine(sentence, parts, index, vectors):
+    """
+    Return the bit vector of `sentence`, given those of its operands.
+    """
+    if isinstance(sentence, Symbol):
+        try:
+            return vectors[index[sentence.name]]
+        except KeyError:
+            raise Exception(f"variable {sentence.name} not in model")
+    if isinstance(sentence, Not):
+        return ~parts[0]
+    if isinstance(sentence, (And, Or)):
+        if not parts:
+            words = len(vectors[0]) if vectors else 1
+            value = ONES if isinstance(sentence, And) else np.uint64(0)
+            return np.full(words, value)
+        result = parts[0].copy()
+        for part in parts[1:]:
+            if isinstance(sentence, And):
+                result &= part
+            else:
+                result |= part
+        return result
+    if isinstance(sentence, Implication):
+        return ~parts[0] | parts[1]
+    if isinstance(sentence, Biconditional):
+        return ~(parts[0] ^ parts[1])
+    raise TypeError(f"cannot evaluate {sentence!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Times MinesweeperAI.add_knowledge over a game on a large board.
+
+The AI plays without the pygame window: it makes a safe move when it knows
+one and a random move otherwise, and is told how many mines surround each
+cell it reveals. Revealing a mine does not end the game here; the mine is
+marked and the AI plays on, so that every game makes `moves` moves.
+
+Run `python benchmark.py [height] [width] [mines] [moves] [seed]`.
+"""
+
+import math
+import random
+import sys
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+HEIGHT = 100
+WIDTH = 100
+MINES = 1500
+MOVES = 2000
+
+
+def main():
+    args = [int(arg) for arg in sys.argv[1:]]
+    if len(args) > 5:
+        sys.exit("Usage: python benchmark.py "
+                 "[height] [width] [mines] [moves] [seed]")
+    defaults = [HEIGHT, WIDTH, MINES, MOVES, 0]
+    height, width, mines, moves, seed = args + defaults[len(args):]
+
+    stats = play(height, width, mines, moves, seed)
+    latencies = sorted(stats["latencies"])
+    print(f"{height}x{width} board, {mines} mines: {len(latencies)} moves "
+          f"({stats['safe']} safe, {stats['random']} random, "
+          f"{stats['exploded']} mines revealed)")
+    print(f"add_knowledge: total {sum(latencies):.2f}s, "
+          f"mean {1000 * sum(latencies) / len(latencies):.3f}ms, "
+          f"p50 {1000 * percentile(latencies, 50):.3f}ms, "
+          f"p99 {1000 * percentile(latencies, 99):.3f}ms, "
+          f"max {1000 * latencies[-1]:.3f}ms")
+    print(f"{stats['sentences']} sentences in the knowledge base at the end")
+
+
+def play(height, width, mines, moves, seed=0):
+    """
+    Plays `moves` moves, returning a dictionary of the seconds taken by
+    each call of `add_knowledge` as "latencies", the number of "safe" and
+    "random" moves, the mines revealed as "exploded", and the number of
+    "sentences" left in the knowledge base.
+    """
+    random.seed(seed)
+    game = Minesweeper(height=height, width=width, mines=mines)
+    ai = MinesweeperAI(height=height, width=width)
+    stats = {"latencies": [], "safe": 0, "random": 0, "exploded": 0}
+    for _ in range(moves):
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            if move is None:
+                break
+            stats["random"] += 1
+        else:
+            stats["safe"] += 1
+
+        if game.is_mine(move):
+            stats["exploded"] += 1
+            ai.mark_mine(move)
+            continue
+        nearby = game.nearby_mines(move)
+        start = time.perf_counter()
+        ai.add_knowledge(move, nearby)
+        stats["latencies"].append(time.perf_counter() - start)
+    stats["sentences"] = len(ai.knowledge)
+    return stats
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of sorted `values`, by the nearest rank.
+    """
+    rank = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+    return values[rank]
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
-import itertools
 import random
+from collections import deque
 
 
 class Minesweeper():
@@ -160,14 +160,29 @@ class MinesweeperAI():
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # Sentences containing each cell, by id, so that marking a cell
+        # only touches the sentences that mention it
+        self.cell_sentences = dict()
+
+        # Sentences that are new or have changed since they were last
+        # compared with the others, in order, and their ids
+        self.worklist = deque()
+        self.queued = set()
+
+        # Each sentence compared since it last changed, by its cells and
+        # count, to find sentences identical to it
+        self.sentence_keys = dict()
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
         self.mines.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.cell_sentences.pop(cell, {}).values():
+            self.forget_key(sentence)
             sentence.mark_mine(cell)
+            self.enqueue(sentence)
 
     def mark_safe(self, cell):
         """
@@ -175,8 +190,46 @@ class MinesweeperAI():
         to mark that cell as safe as well.
         """
         self.safes.add(cell)
-        for sentence in self.knowledge:
+        for sentence in self.cell_sentences.pop(cell, {}).values():
+            self.forget_key(sentence)
             sentence.mark_safe(cell)
+            self.enqueue(sentence)
+
+    def add_sentence(self, sentence):
+        """
+        Adds a sentence to the knowledge base and to the index of the
+        sentences containing each cell, and queues it to be compared with
+        the others.
+        """
+        self.knowledge.append(sentence)
+        for cell in sentence.cells:
+            self.cell_sentences.setdefault(cell, {})[id(sentence)] = sentence
+        self.enqueue(sentence)
+
+    def unindex(self, sentence, cells):
+        """
+        Removes a sentence from the index entries of `cells`, before those
+        cells are removed from it.
+        """
+        for cell in cells:
+            sentences = self.cell_sentences.get(cell)
+            if sentences is not None:
+                sentences.pop(id(sentence), None)
+                if not sentences:
+                    del self.cell_sentences[cell]
+
+    def enqueue(self, sentence):
+        if id(sentence) not in self.queued:
+            self.queued.add(id(sentence))
+            self.worklist.append(sentence)
+
+    def forget_key(self, sentence):
+        """
+        Removes a sentence from `sentence_keys`, before it is changed.
+        """
+        key = (frozenset(sentence.cells), sentence.count)
+        if self.sentence_keys.get(key) is sentence:
+            del self.sentence_keys[key]
 
     def add_knowledge(self, cell, count):
         """
@@ -215,66 +268,81 @@ class MinesweeperAI():
 
         if new_cells:
             new_sentence = Sentence(new_cells, count)
-            self.knowledge.append(new_sentence)  # for 3)
-
-        # for 4) and 5)
-        # Recursive function for knowledge update including inferring
-        def update_knowledge():
-            # Update the sets of safe cells and mines
-            mines_safes_changed = False
-            for sen in self.knowledge:
-                new_mines = sen.known_mines()
-                new_safes = sen.known_safes()
-                if new_mines:
-                    self.mines |= new_mines
-                    mines_safes_changed = True
-                if new_safes:
-                    self.safes |= new_safes
-                    mines_safes_changed = True
-                if new_mines or new_safes:
-                    # Remove this sentence as the information has been processed
-                    self.knowledge.remove(sen)
-
-            # Update sentences with the known safe cells and known mines
-            kb_changed = False
-            if mines_safes_changed:
-                for sen in self.knowledge:
-                    for mine in self.mines:
-                        if mine in sen.cells:
-                            sen.cells.remove(mine)
-                            sen.count -= 1
-                            kb_changed = True
-                    for safe_cell in self.safes:
-                        if safe_cell in sen.cells:
-                            sen.cells.remove(safe_cell)
-                            kb_changed = True
-
-            if kb_changed:
-                update_knowledge()
-            else:
-                # Inferring new knowledge
-                sen_changed = True
-                kb_changed = False
-                while sen_changed:
-                    sen_changed = False
-                    for i, j in itertools.combinations(range(len(self.knowledge)), 2):
-                        s_i = self.knowledge[i]
-                        s_j = self.knowledge[j]
-
-                        if s_j.cells.issubset(s_i.cells):
-                            s_i.cells -= s_j.cells
-                            s_i.count -= s_j.count
-                            sentence_changed = True
-                            kb_changed = True
-                        elif s_i.cells.issubset(s_j.cells):
-                            s_j.cells -= s_i.cells
-                            s_j.count -= s_i.count
-                            sen_changed = True
-                            kb_changed = True
-                if kb_changed:
-                    update_knowledge()
-
-        update_knowledge()
+            self.add_sentence(new_sentence)  # for 3)
+
+        self.update_knowledge()  # for 4) and 5)
+
+    def update_knowledge(self):
+        """
+        Draws every conclusion that follows from the queued sentences.
+
+        Each sentence taken from the worklist is dropped if it gives away
+        its cells as mines or safe, which are then marked, or if an
+        identical sentence is known. Otherwise it is compared with just
+        the sentences that share a cell with it: when one sentence's cells
+        are a subset of another's, they are removed from the larger one,
+        which goes back on the worklist. Which subset is removed first can
+        decide what is inferred later, so the largest is, which leaves the
+        fewest cells behind. Marking cells queues the sentences that
+        contain them, so the worklist empties once nothing more can be
+        inferred.
+        """
+        removed = dict()
+        while self.worklist:
+            sen = self.worklist.popleft()
+            self.queued.discard(id(sen))
+            if id(sen) in removed:
+                continue
+
+            # Mark the cells the sentence gives away
+            new_mines = set(sen.known_mines())
+            new_safes = set(sen.known_safes())
+            if new_mines or new_safes or not sen.cells:
+                # Remove this sentence as the information has been processed
+                self.unindex(sen, sen.cells)
+                removed[id(sen)] = sen
+                for mine in new_mines:
+                    self.mark_mine(mine)
+                for safe_cell in new_safes:
+                    self.mark_safe(safe_cell)
+                continue
+
+            # Drop the sentence if it is identical to one already compared
+            key = (frozenset(sen.cells), sen.count)
+            if self.sentence_keys.get(key, sen) is not sen:
+                self.unindex(sen, sen.cells)
+                removed[id(sen)] = sen
+                continue
+            self.sentence_keys[key] = sen
+
+            # Infer new knowledge from the sentences sharing a cell
+            others = dict()
+            for cell in sen.cells:
+                others.update(self.cell_sentences.get(cell, {}))
+            others.pop(id(sen), None)
+            subsets = [other for other in others.values()
+                       if other.cells < sen.cells]
+            if subsets:
+                self.subtract(sen, max(subsets, key=lambda s: len(s.cells)))
+                continue
+            for other in others.values():
+                if sen.cells < other.cells:
+                    self.subtract(other, sen)
+
+        if removed:
+            self.knowledge = [sen for sen in self.knowledge
+                              if id(sen) not in removed]
+
+    def subtract(self, sentence, subset):
+        """
+        Removes the cells of `subset` from `sentence`, and their mines from
+        its count, and queues it to be compared again.
+        """
+        self.forget_key(sentence)
+        self.unindex(sentence, subset.cells)
+        sentence.cells -= subset.cells
+        sentence.count -= subset.count
+        self.enqueue(sentence)
 
     def make_safe_move(self):
         """
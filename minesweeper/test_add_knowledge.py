@@ -1,3 +1,5 @@
+import random
+
 import minesweeper as ms
 
 def test_addknowledge7():
@@ -59,11 +61,76 @@ def test_addknowledge10():
         print("test_addknowledge10 passed")
 
 
+def test_cell_index():
+    """MinesweeperAI keeps its cell index in step with its knowledge and stays sound"""
+    random.seed(1)
+    game = ms.Minesweeper(height=30, width=30, mines=120)
+    ai = ms.MinesweeperAI(height=30, width=30)
+    for _ in range(400):
+        move = ai.make_safe_move() or ai.make_random_move()
+        if move is None:
+            break
+        if game.is_mine(move):
+            ai.mark_mine(move)
+        else:
+            ai.add_knowledge(move, game.nearby_mines(move))
+    indexed = {(cell, id(sentence)) for cell, sentences in ai.cell_sentences.items()
+               for sentence in sentences.values()}
+    expected = {(cell, id(sentence)) for sentence in ai.knowledge
+                for cell in sentence.cells}
+    if indexed != expected:
+        print(f"mismatch: index has {len(indexed)} entries, knowledge {len(expected)}")
+    elif not ai.mines <= game.mines or ai.safes & game.mines:
+        print("inferred a mine or safe cell that is wrong")
+    else:
+        print("test_cell_index passed")
+
+
+def test_worklist():
+    """MinesweeperAI.update_knowledge drops duplicate sentences and empties its worklist"""
+    ai = ms.MinesweeperAI(height=4, width=5)
+    ai.add_sentence(ms.Sentence({(0, 0), (0, 1), (0, 2)}, 1))
+    ai.add_sentence(ms.Sentence({(0, 0), (0, 1), (0, 2)}, 1))
+    ai.add_sentence(ms.Sentence({(0, 1), (0, 2)}, 1))
+    ai.update_knowledge()
+    expected = [ms.Sentence({(0, 1), (0, 2)}, 1)]
+    if ai.knowledge != expected or (0, 0) not in ai.safes:
+        print(f"mismatch: expected {[str(s) for s in expected]}, "
+              f"result {[str(s) for s in ai.knowledge]}")
+    elif ai.worklist or ai.queued:
+        print("worklist not empty after update_knowledge")
+    else:
+        print("test_worklist passed")
+
+
+def test_largest_subset():
+    """MinesweeperAI.update_knowledge removes the largest subset of a sentence first"""
+    ai = ms.MinesweeperAI(height=8, width=8)
+    ai.add_knowledge((2, 0), 1)
+    ai.add_knowledge((3, 0), 1)
+    ai.add_knowledge((3, 2), 0)
+    ai.add_knowledge((4, 1), 2)
+    ai.add_knowledge((6, 0), 2)
+    # {(5, 0), (5, 1), (7, 0), (7, 1)} has 2 mines, so the rest of (6, 1)'s
+    # neighbours have none
+    ai.add_knowledge((6, 1), 2)
+    safes = [(5, 2), (6, 2), (7, 2)]
+    for safe in safes:
+        if safe not in ai.safes:
+            print(f"did not find {safe} in safe cells when possible to conclude safe")
+            break
+    else:
+        print("test_largest_subset passed")
+
+
 def main():
     test_addknowledge7()
     test_addknowledge8()
     test_addknowledge9()
     test_addknowledge10()
+    test_cell_index()
+    test_worklist()
+    test_largest_subset()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Searches for the computer's move on a background thread.
+
+`runner.py` draws the window and handles events in a single loop, so a
+search called from the loop freezes the window until it returns. A
+`Search` runs the search on its own thread instead. The loop asks whether
+it is done on every frame, draws its progress in the meantime, and
+cancels it if the game is reset.
+"""
+
+import threading
+import time
+
+
+class Search():
+    """
+    A call of `function(board, stats=progress, cancel=event)` running on a
+    daemon thread, where `progress` is a dictionary the function keeps up
+    to date, and `event` is set to ask it to stop.
+    """
+
+    def __init__(self, function, board):
+        self.progress = dict()
+        self.cancelled = threading.Event()
+        self.started = time.perf_counter()
+        self.action = None
+        self.error = None
+        self.finished = threading.Event()
+        self.thread = threading.Thread(
+            target=self.run, args=(function, board), daemon=True
+        )
+        self.thread.start()
+
+    def run(self, function, board):
+        try:
+            self.action = function(board, stats=self.progress,
+                                   cancel=self.cancelled)
+        except Exception as error:
+            self.error = error
+        finally:
+            self.finished.set()
+
+    def done(self):
+        """
+        Returns True once the search has returned.
+        """
+        return self.finished.is_set()
+
+    def result(self, timeout=None):
+        """
+        Waits up to `timeout` seconds for the search, and returns the
+        action it found, raising any exception it raised.
+        """
+        if not self.finished.wait(timeout):
+            raise TimeoutError("search is still running")
+        if self.error is not None:
+            raise self.error
+        return self.action
+
+    def cancel(self):
+        """
+        Asks the search to stop, without waiting for it. Its result should
+        be ignored.
+        """
+        self.cancelled.set()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
@@ -0,0 +1,231 @@
+"""
+Tic Tac Toe on bitboards.
+
+`tictactoe.py` keeps the board as a list of lists: `player` counts every
+cell, `result` copies the whole board, and `winner` rebuilds sets of rows
+on every call. Here a board is a pair of 9-bit masks `(x, o)`, with cell
+(i, j) as bit 3 * i + j. A move sets one bit, the player to move and the
+winner are looked up in tables of all 512 masks, and the search makes and
+unmakes moves on a single pair of masks without copying anything.
+
+The functions have the same names and meanings as those in `tictactoe.py`,
+and `from_board` and `to_board` convert to and from its boards.
+
+Run `python bitboard.py` to compare the nodes searched per second with
+`tictactoe.minimax_alphabeta`.
+"""
+
+import time
+
+import tictactoe as ttt
+
+X = ttt.X
+O = ttt.O
+EMPTY = ttt.EMPTY
+
+FULL = 0b111111111
+
+# Masks of the rows, columns and diagonals
+WIN_MASKS = (
+    [0b111 << (3 * i) for i in range(3)] +
+    [0b001001001 << j for j in range(3)] +
+    [0b100010001, 0b001010100]
+)
+
+# For every mask, whether it holds a line, and how many cells it has
+WINS = [any(mask & line == line for line in WIN_MASKS)
+        for mask in range(FULL + 1)]
+COUNTS = [bin(mask).count("1") for mask in range(FULL + 1)]
+
+# Bits in order of how many lines pass through them, which makes
+# alpha-beta cutoffs come sooner
+MOVE_ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+
+def main():
+    for name, search, board in [
+        ("tictactoe.minimax_alphabeta", ttt.minimax_alphabeta,
+         ttt.initial_state()),
+        ("bitboard.minimax", minimax, initial_state())
+    ]:
+        stats = dict()
+        start = time.perf_counter()
+        move = search(board, stats=stats)
+        seconds = time.perf_counter() - start
+        print(f"{name}: {stats['nodes']} nodes in {seconds:.3f}s, "
+              f"{stats['nodes'] / seconds:,.0f} nodes/s, move {move}")
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return 0, 0
+
+
+def from_board(board):
+    """
+    Returns the bitboard of a list of lists board from `tictactoe.py`.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(bitboard):
+    """
+    Returns the list of lists board from `tictactoe.py` of a bitboard.
+    """
+    x, o = bitboard
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def player(bitboard):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x, o = bitboard
+    return O if COUNTS[x] > COUNTS[o] else X
+
+
+def actions(bitboard):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x, o = bitboard
+    empty = ~(x | o) & FULL
+    return {divmod(k, 3) for k in range(9) if empty >> k & 1}
+
+
+def result(bitboard, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if i not in range(3) or j not in range(3):
+        raise IndexError
+    bit = 1 << (3 * i + j)
+    x, o = bitboard
+    if (x | o) & bit:
+        raise ValueError
+    if COUNTS[x] > COUNTS[o]:
+        return x, o | bit
+    return x | bit, o
+
+
+def winner(bitboard):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x, o = bitboard
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(bitboard):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x, o = bitboard
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def utility(bitboard):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x, o = bitboard
+    return 1 if WINS[x] else -1 if WINS[o] else 0
+
+
+class Position():
+    """
+    A board that moves are made and unmade on in place, with the masks of
+    the player to move and of the other player.
+    """
+
+    def __init__(self, bitboard):
+        x, o = bitboard
+        if COUNTS[x] > COUNTS[o]:
+            self.mover, self.other = o, x
+        else:
+            self.mover, self.other = x, o
+
+    def make(self, k):
+        self.mover, self.other = self.other, self.mover | 1 << k
+
+    def unmake(self, k):
+        self.mover, self.other = self.other & ~(1 << k), self.mover
+
+
+def minimax(bitboard, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
+
+    This is alpha-beta search, in negamax form, making and unmaking moves
+    on a single `Position`. If `stats` is a dictionary, the number of
+    positions searched is added to its "nodes" entry, the number of
+    alpha-beta cutoffs to "cutoffs", and "depth" is raised to the most
+    moves searched ahead.
+    """
+    if terminal(bitboard):
+        return None
+    position = Position(bitboard)
+    nodes = cutoffs = deepest = 0
+
+    def search(alpha, beta, ply):
+        """
+        Returns the value of the position for the player to move.
+        """
+        nonlocal nodes, cutoffs, deepest
+        nodes += 1
+        if ply > deepest:
+            deepest = ply
+
+        # The player who just moved is the only one who can have won
+        if WINS[position.other]:
+            return -1
+        occupied = position.mover | position.other
+        if occupied == FULL:
+            return 0
+        for k in MOVE_ORDER:
+            if occupied >> k & 1:
+                continue
+            position.make(k)
+            v = -search(-beta, -alpha, ply + 1)
+            position.unmake(k)
+            if v > alpha:
+                alpha = v
+                if alpha >= beta:
+                    cutoffs += 1
+                    break
+        return alpha
+
+    best, move = -2, None
+    occupied = position.mover | position.other
+    for k in MOVE_ORDER:
+        if occupied >> k & 1:
+            continue
+        position.make(k)
+        v = -search(-1, -best, 1)
+        position.unmake(k)
+        if v > best:
+            best, move = v, k
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + nodes + 1
+        stats["cutoffs"] = stats.get("cutoffs", 0) + cutoffs
+        stats["depth"] = max(stats.get("depth", 0), deepest)
+    return divmod(move, 3)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Monte Carlo Tree Search for Tic Tac Toe on m x n boards, won by k in a row.
+
+Instead of searching every move, MCTS grows a tree of the positions it has
+visited, and scores each by the games played out from it to the end:
+
+selection: from the root, follow the child with the best UCT score, its
+    win rate plus a bonus for children visited less often than their
+    siblings, until reaching a position with a move not yet tried.
+expansion: make one untried move, adding the position to the tree.
+rollout: play the game out from there, with random moves, or with
+    heuristic ones that take a win or block a loss when there is one.
+backpropagation: count the visit and the outcome in every position on
+    the way back to the root.
+
+Rollouts are played in batches: `batch` positions are selected before any
+is played out, each selection counting as a visit so that the next one
+goes elsewhere, and the batch is then played out on a pool of `workers`
+processes. The tree is kept between moves, and the subtree under the
+position after the opponent's reply becomes the next root.
+
+Run `python mcts.py m n k [seconds] [workers]` to watch MCTS play
+iterative-deepening `mnk.Game.minimax`.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mnk import EMPTY, O, X, Game
+
+# Seconds to search for a move
+BUDGET = 1.0
+
+# Weight of the UCT bonus for visiting less explored children
+EXPLORATION = math.sqrt(2)
+
+# Positions selected, then played out together
+BATCH = 64
+
+# Game and rollout policy of a worker process
+worker = None
+
+
+class Node():
+    """
+    A position in the search tree, with the number of times it was visited
+    and the outcomes for the player who made the move into it, counting a
+    win as 1 and a tie as 1/2.
+    """
+
+    def __init__(self, board, move=None, parent=None, mover=None,
+                 winner=None, over=False):
+        self.board = board
+        self.move = move
+        self.parent = parent
+        self.mover = mover
+        self.winner = winner
+        self.over = over
+        self.children = []
+        self.untried = None
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS():
+    """
+    A Monte Carlo Tree Search player for a `mnk.Game`.
+    """
+
+    def __init__(self, game, exploration=EXPLORATION, heuristic=True,
+                 workers=1, batch=BATCH, seed=None):
+        self.game = game
+        self.exploration = exploration
+        self.heuristic = heuristic
+        self.workers = workers or os.cpu_count()
+        self.batch = batch
+        self.random = random.Random(seed)
+        self.root = None
+        self.executor = None
+
+    def close(self):
+        """
+        Shuts down the worker processes, if any were started.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def move(self, board, budget=BUDGET, playouts=None, stats=None):
+        """
+        Returns the most visited action for the current player on the
+        board after searching for `budget` seconds, or for `playouts`
+        rollouts if that is given, or a legal action if no rollout was
+        played.
+
+        If `stats` is a dictionary, the number of rollouts played is added
+        to its "playouts" entry, and the visits kept from the previous
+        search are set as its "reused".
+        """
+        if self.game.terminal(board):
+            return None
+        deadline = time.perf_counter() + budget
+        root = self.reuse(board)
+        reused = root.visits
+        played = 0
+        while (played < playouts if playouts is not None
+               else time.perf_counter() < deadline):
+            size = self.batch
+            if playouts is not None:
+                size = min(size, playouts - played)
+            leaves = [self.select(root) for _ in range(size)]
+            winners = self.rollouts([leaf for leaf in leaves
+                                     if not leaf.over])
+            for leaf in leaves:
+                winner = leaf.winner if leaf.over else next(winners)
+                self.backpropagate(leaf, winner)
+            played += size
+
+        if stats is not None:
+            stats["playouts"] = stats.get("playouts", 0) + played
+            stats["reused"] = reused
+
+        # Too small a budget may leave no rollout from the board
+        if not root.children:
+            return root.untried[-1] if root.untried else min(
+                self.game.actions(board))
+        best = max(root.children, key=lambda child: child.visits)
+        return best.move
+
+    def reuse(self, board):
+        """
+        Returns the node of the board in the tree, if it is the root or
+        up to two moves below it, and makes it the root of a new tree.
+        """
+        nodes = [self.root] if self.root is not None else []
+        for _ in range(3):
+            for node in nodes:
+                if node.board == board:
+                    node.parent = None
+                    self.root = node
+                    return node
+            nodes = [child for node in nodes for child in node.children]
+        self.root = Node([row[:] for row in board])
+        return self.root
+
+    def select(self, node):
+        """
+        Returns a new leaf below `node`, or a finished game, counting a
+        visit at every position on the way.
+        """
+        node.visits += 1
+        while not node.over:
+            if node.untried is None:
+                node.untried = list(self.game.actions(node.board))
+                self.random.shuffle(node.untried)
+            if node.untried:
+                return self.expand(node)
+            log = math.log(node.visits)
+            node = max(node.children, key=lambda child: (
+                child.wins / child.visits +
+                self.exploration * math.sqrt(log / child.visits)
+            ))
+            node.visits += 1
+        return node
+
+    def expand(self, node):
+        move = node.untried.pop()
+        mover = self.game.player(node.board)
+        board = [row[:] for row in node.board]
+        board[move[0]][move[1]] = mover
+        if self.game.wins(board, move):
+            winner, over = mover, True
+        else:
+            winner, over = None, all(cell is not EMPTY
+                                     for row in board for cell in row)
+        child = Node(board, move, node, mover, winner, over)
+        child.visits += 1
+        node.children.append(child)
+        return child
+
+    def rollouts(self, leaves):
+        """
+        Returns an iterator over the winners of games played out from the
+        leaves, on the worker processes if there is more than one.
+        """
+        boards = [leaf.board for leaf in leaves]
+        if self.workers == 1 or len(leaves) < 2:
+            rng = random.Random(self.random.randrange(2 ** 32))
+            return iter([playout(self.game, board, self.heuristic, rng)
+                         for board in boards])
+
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=start_worker,
+                initargs=(self.game, self.heuristic)
+            )
+        size = math.ceil(len(boards) / self.workers)
+        chunks = [(boards[i:i + size], self.random.randrange(2 ** 32))
+                  for i in range(0, len(boards), size)]
+        results = self.executor.map(play_chunk, chunks)
+        return (winner for chunk in results for winner in chunk)
+
+    def backpropagate(self, node, winner):
+        while node is not None:
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.mover:
+                node.wins += 1
+            node = node.parent
+
+
+def start_worker(game, heuristic):
+    global worker
+    worker = (game, heuristic)
+
+
+def play_chunk(chunk):
+    boards, seed = chunk
+    game, heuristic = worker
+    rng = random.Random(seed)
+    return [playout(game, board, heuristic, rng) for board in boards]
+
+
+def playout(game, board, heuristic, rng):
+    """
+    Returns the winner of the game played out from the board, or None for
+    a tie, with random moves, or, if `heuristic`, moves that win at once
+    or stop the opponent from winning at once when there are any.
+
+    The pieces of each player in every line are counted as moves are made,
+    so a move that completes a line is found without trying every move.
+    """
+    board = [row[:] for row in board]
+    counts = {X: [0] * len(game.lines), O: [0] * len(game.lines)}
+    for index, line in enumerate(game.lines):
+        for i, j in line:
+            if board[i][j] is not EMPTY:
+                counts[board[i][j]][index] += 1
+    moves = list(game.actions(board))
+    rng.shuffle(moves)
+    who = game.player(board)
+    while moves:
+        other = O if who == X else X
+        move = None
+        if heuristic:
+            move = (forcing_move(game, board, counts, who, other) or
+                    forcing_move(game, board, counts, other, who))
+        if move is None:
+            move = moves.pop()
+        else:
+            moves.remove(move)
+        board[move[0]][move[1]] = who
+        mine = counts[who]
+        for index in game.line_indices[move]:
+            mine[index] += 1
+            if mine[index] == game.k:
+                return who
+        who = other
+    return None
+
+
+def forcing_move(game, board, counts, player, other):
+    """
+    Returns an empty cell that would complete a line for `player`, or None
+    if there is none.
+    """
+    mine, theirs = counts[player], counts[other]
+    for index, line in enumerate(game.lines):
+        if mine[index] == game.k - 1 and theirs[index] == 0:
+            for i, j in line:
+                if board[i][j] is EMPTY:
+                    return i, j
+    return None
+
+
+def main():
+    if len(sys.argv) not in range(4, 7):
+        sys.exit("Usage: python mcts.py m n k [seconds] [workers]")
+    m, n, k = (int(arg) for arg in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) > 4 else BUDGET
+    workers = int(sys.argv[5]) if len(sys.argv) > 5 else 1
+    game = Game(m, n, k)
+    player = MCTS(game, workers=workers)
+    board = game.initial_state()
+    try:
+        while not game.terminal(board):
+            stats = dict()
+            if game.player(board) == X:
+                move = player.move(board, budget, stats=stats)
+                print(f"MCTS plays {move} after {stats['playouts']} "
+                      f"playouts, reusing {stats['reused']} visits")
+            else:
+                move = game.minimax(board, budget, stats=stats)
+                print(f"minimax plays {move} after searching "
+                      f"{stats['nodes']} nodes to depth {stats['depth']}")
+            board = game.result(board, move)
+    finally:
+        player.close()
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    who = game.winner(board)
+    print(f"{who} wins." if who else "Tie.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Tic Tac Toe generalized to m x n boards where k in a row wins.
+
+`tictactoe.py` searches the 3 x 3 game to the end, which is hopeless on
+bigger boards. A `Game` has the same functions as `tictactoe.py`, as
+methods, for any m, n and k. Its `minimax` searches with iterative
+deepening: alpha-beta search to depth 1, 2, 3 and so on, scoring the
+positions where the depth runs out with a heuristic evaluation, until
+the game is searched to the end or the time budget is spent. It then
+returns the best move of the deepest search that finished, or of the
+unfinished one if that got far enough to improve on it.
+
+Moves are searched best first to get more alpha-beta cutoffs: at the root
+in order of their scores from the previous depth, and elsewhere in order
+of how often they caused a cutoff before, then by how many lines of k
+cells pass through them.
+
+Run `python mnk.py m n k [seconds]` to watch the computer play itself.
+"""
+
+import sys
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Seconds to search for a move
+BUDGET = 1.0
+
+# Score of a win, less the number of moves it takes
+WIN = 10 ** 9
+
+INFINITY = float("inf")
+
+
+class Timeout(Exception):
+    """
+    Raised inside the search when the time budget runs out.
+    """
+
+
+class Game():
+    """
+    Tic Tac Toe on a board of m rows and n columns, won by k in a row.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if not 0 < k <= max(m, n):
+            raise ValueError(f"cannot make {k} in a row on {m} x {n}")
+        self.m = m
+        self.n = n
+        self.k = k
+
+        # Every line of k cells, and the lines through each cell, as lines
+        # and as their indices in `lines`
+        self.lines = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+                    line = tuple((i + s * di, j + s * dj) for s in range(k))
+                    if all(0 <= a < m and 0 <= b < n for a, b in line):
+                        self.lines.append(line)
+        self.lines_through = {
+            (i, j): [] for i in range(m) for j in range(n)
+        }
+        self.line_indices = {cell: [] for cell in self.lines_through}
+        for index, line in enumerate(self.lines):
+            for cell in line:
+                self.lines_through[cell].append(line)
+                self.line_indices[cell].append(index)
+
+    def initial_state(self):
+        """
+        Returns starting state of the board.
+        """
+        return [[EMPTY] * self.n for _ in range(self.m)]
+
+    def player(self, board):
+        """
+        Returns player who has the next turn on a board.
+        """
+        countX = sum(row.count(X) for row in board)
+        countO = sum(row.count(O) for row in board)
+        return O if countX > countO else X
+
+    def actions(self, board):
+        """
+        Returns set of all possible actions (i, j) available on the board.
+        """
+        return {(i, j) for i in range(self.m) for j in range(self.n)
+                if board[i][j] is EMPTY}
+
+    def result(self, board, action):
+        """
+        Returns the board that results from making move (i, j) on the board.
+        """
+        i, j = action
+        if i not in range(self.m) or j not in range(self.n):
+            raise IndexError
+        if board[i][j] is not EMPTY:
+            raise ValueError
+        newBoard = [row[:] for row in board]
+        newBoard[i][j] = self.player(board)
+        return newBoard
+
+    def winner(self, board):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        for line in self.lines:
+            i, j = line[0]
+            first = board[i][j]
+            if first is not EMPTY and all(board[a][b] == first
+                                          for a, b in line):
+                return first
+        return None
+
+    def terminal(self, board):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return (self.winner(board) is not None or
+                all(cell is not EMPTY for row in board for cell in row))
+
+    def utility(self, board):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        who = self.winner(board)
+        return 1 if who == X else -1 if who == O else 0
+
+    def wins(self, board, action):
+        """
+        Returns True if the move just made at `action` completed a line.
+        """
+        i, j = action
+        who = board[i][j]
+        return any(all(board[a][b] == who for a, b in line)
+                   for line in self.lines_through[action])
+
+    def evaluate(self, board, who):
+        """
+        Returns a heuristic score of the board for player `who`.
+
+        Every line that only one player has pieces in is worth 10 ^ (c - 1)
+        to that player, where c is the number of their pieces in it. The
+        score is kept below the score of any win, so that the search never
+        takes a heuristic score for a forced win.
+        """
+        score = 0
+        for line in self.lines:
+            countX = countO = 0
+            for i, j in line:
+                if board[i][j] == X:
+                    countX += 1
+                elif board[i][j] == O:
+                    countO += 1
+            if countO == 0 and countX:
+                score += 10 ** (countX - 1)
+            elif countX == 0 and countO:
+                score -= 10 ** (countO - 1)
+        bound = WIN - self.m * self.n - 1
+        score = max(-bound, min(bound, score))
+        return score if who == X else -score
+
+    def minimax(self, board, budget=BUDGET, max_depth=None, stats=None,
+                cancel=None):
+        """
+        Returns the best action found for the current player on the board
+        within `budget` seconds, searching at most `max_depth` moves ahead.
+        The search also stops early, with the best action found so far,
+        once `cancel`, a `threading.Event`, is set.
+
+        If `stats` is a dictionary, the number of positions searched is
+        added to its "nodes" entry, the number of alpha-beta cutoffs to
+        "cutoffs", and the depth of the deepest finished search is set as
+        its "depth". Nodes and depth are kept up to date during the search,
+        so another thread can show its progress.
+        """
+        if self.terminal(board):
+            return None
+        if stats is None:
+            stats = dict()
+        stats.setdefault("nodes", 0)
+        stats.setdefault("cutoffs", 0)
+        stats["depth"] = 0
+        counted = stats["nodes"]
+        board = [row[:] for row in board]
+        deadline = time.perf_counter() + budget
+        mover = self.player(board)
+        empty = sorted(self.actions(board),
+                       key=lambda a: len(self.lines_through[a]), reverse=True)
+        if max_depth is None:
+            max_depth = len(empty)
+        history = dict()
+        nodes = 0
+        exhaustive = True
+
+        def search(who, depth, alpha, beta, ply):
+            """
+            Returns the score of the board for `who`, the player to move.
+            """
+            nonlocal nodes, exhaustive
+            nodes += 1
+
+            # A leaf's evaluation scans every line, which takes most of a
+            # millisecond on big boards, so the clock is read every node
+            stats["nodes"] = counted + nodes
+            if (time.perf_counter() > deadline or
+                    cancel is not None and cancel.is_set()):
+                raise Timeout
+            moves = [a for a in empty if board[a[0]][a[1]] is EMPTY]
+            if not moves:
+                return 0
+            if depth == 0:
+                exhaustive = False
+                return self.evaluate(board, who)
+
+            moves.sort(key=lambda a: history.get(a, 0), reverse=True)
+            other = O if who == X else X
+            v = -INFINITY
+            for a in moves:
+                i, j = a
+                board[i][j] = who
+                if self.wins(board, a):
+                    v2 = WIN - ply
+                else:
+                    v2 = -search(other, depth - 1, -beta, -max(alpha, v),
+                                 ply + 1)
+                board[i][j] = EMPTY
+                if v2 > v:
+                    v = v2
+                if v >= beta:
+                    history[a] = history.get(a, 0) + depth * depth
+                    stats["cutoffs"] += 1
+                    break
+            return v
+
+        best = empty[0]
+        order = list(empty)
+        depth = 0
+        other = O if mover == X else X
+        try:
+            for depth in range(1, max_depth + 1):
+                exhaustive = True
+                scores = dict()
+                alpha, current = -INFINITY, None
+                for a in order:
+                    i, j = a
+                    board[i][j] = mover
+                    if self.wins(board, a):
+                        v = WIN
+                    else:
+                        v = -search(other, depth - 1, -INFINITY, -alpha, 1)
+                    board[i][j] = EMPTY
+                    scores[a] = v
+                    if v > alpha:
+                        alpha, current = v, a
+                best = current
+                stats["depth"] = depth
+
+                # Search the best moves first at the next depth, and stop
+                # once the game is searched to the end or decided
+                order.sort(key=lambda a: scores[a], reverse=True)
+                if exhaustive or abs(alpha) >= WIN - len(empty):
+                    break
+        except Timeout:
+
+            # The previous best move was searched first, so any move
+            # finished at this depth is at least as good
+            if current is not None:
+                best = current
+            depth -= 1
+
+        stats["nodes"] = counted + nodes
+        stats["depth"] = depth
+        return best
+
+
+def main():
+    if len(sys.argv) not in [4, 5]:
+        sys.exit("Usage: python mnk.py m n k [seconds]")
+    m, n, k = (int(arg) for arg in sys.argv[1:4])
+    budget = float(sys.argv[4]) if len(sys.argv) == 5 else BUDGET
+    game = Game(m, n, k)
+    board = game.initial_state()
+    while not game.terminal(board):
+        stats = dict()
+        start = time.perf_counter()
+        move = game.minimax(board, budget, stats=stats)
+        seconds = time.perf_counter() - start
+        print(f"{game.player(board)} plays {move} after searching "
+              f"{stats['nodes']} nodes to depth {stats['depth']} "
+              f"in {seconds:.2f}s")
+        board = game.result(board, move)
+    for row in board:
+        print(" ".join(cell or "." for cell in row))
+    who = game.winner(board)
+    print(f"{who} wins." if who else "Tie.")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,28 @@ import pygame
 import sys
 import time
 
+import background
+import mnk
+import solved
 import tictactoe as ttt
 
+# Play the 3 x 3 game, or an m x n board won by k in a row
+if len(sys.argv) == 4:
+    game = mnk.Game(*(int(arg) for arg in sys.argv[1:]))
+    rows, cols = game.m, game.n
+elif len(sys.argv) == 1:
+    game = ttt
+    rows, cols = 3, 3
+else:
+    sys.exit("Usage: python runner.py [m n k]")
+
 pygame.init()
 size = width, height = 600, 400
 
+# Frames drawn per second, and the least time the computer takes to move
+fps = 30
+think_time = 0.5
+
 # Colors
 black = (0, 0, 0)
 white = (255, 255, 255)
@@ -15,18 +32,41 @@ screen = pygame.display.set_mode(size)
 
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+tile_size = min(80, (height - 100) // rows, (width - 40) // cols)
+moveFont = pygame.font.Font("OpenSans-Regular.ttf", tile_size * 3 // 4)
 
 user = None
-board = ttt.initial_state()
-ai_turn = False
+board = game.initial_state()
+search = None
+
+# Every 3 x 3 position solved in advance, loaded by the first 3 x 3 search
+table = None
+
+
+def think(board, stats, cancel):
+    """
+    Returns the computer's move, to be called on a background thread.
+    """
+    global table
+    if game is ttt:
+        if table is None:
+            table = solved.load()
+        return solved.minimax(board, table)
+    return game.minimax(board, stats=stats, cancel=cancel)
 
+
+clock = pygame.time.Clock()
 while True:
 
+    reset = False
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             sys.exit()
 
+        # Pressing R starts over, even while the computer is thinking
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            reset = True
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -67,13 +107,12 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_origin = (width / 2 - (cols / 2 * tile_size),
+                       height / 2 - (rows / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(rows):
             row = []
-            for j in range(3):
+            for j in range(cols):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -89,12 +128,12 @@ while True:
                 row.append(rect)
             tiles.append(row)
 
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
+        game_over = game.terminal(board)
+        player = game.player(board)
 
         # Show title
         if game_over:
-            winner = ttt.winner(board)
+            winner = game.winner(board)
             if winner is None:
                 title = f"Game Over: Tie."
             else:
@@ -108,24 +147,30 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, searching in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+            if search is None:
+                search = background.Search(think, board)
+            elif search.done() and search.elapsed() >= think_time:
+                board = game.result(board, search.result())
+                search = None
+            elif search.progress.get("nodes"):
+                progress = mediumFont.render(
+                    f"Depth {search.progress['depth']}, "
+                    f"{search.progress['nodes']:,} positions", True, white
+                )
+                progressRect = progress.get_rect()
+                progressRect.center = ((width / 2), height - 25)
+                screen.blit(progress, progressRect)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
         if click == 1 and user == player and not game_over:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(rows):
+                for j in range(cols):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
+                        board = game.result(board, (i, j))
 
         if game_over:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
@@ -139,8 +184,14 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    reset = True
+
+    if reset:
+        user = None
+        board = game.initial_state()
+        if search is not None:
+            search.cancel()
+            search = None
 
     pygame.display.flip()
+    clock.tick(fps)
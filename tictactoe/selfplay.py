@@ -0,0 +1,224 @@
+"""
+Headless self-play between Tic Tac Toe engines.
+
+Every ordered pair of engines plays `games` games of 3 x 3 Tic Tac Toe,
+one engine as X and the other as O. The search engines are deterministic,
+so each game opens with `OPENING` random moves, from a seed given by the
+game's number. Games are played on a pool of processes.
+
+Every move is timed, and the `stats` its engine fills in are kept. The
+report gives for each engine the moves made, the nodes searched per
+second and per move, the alpha-beta cutoffs per move, the deepest search,
+and the 50th, 90th and 99th percentiles of the time per move; and then
+the outcome of every pairing. MCTS playouts are counted as nodes.
+
+Run `python selfplay.py [games] [workers] [engine ...]`, with engines from
+`ENGINES`, all of them by default.
+"""
+
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import mcts
+import mnk
+import solved
+import tictactoe as ttt
+
+GAMES = 100
+
+# Random moves at the start of every game
+OPENING = 2
+
+# Seconds and playouts per move for the engines that are limited by them
+BUDGET = 0.5
+PLAYOUTS = 500
+
+# Solved game table of each process
+table = None
+
+
+def random_player():
+    return lambda board, stats: random.choice(sorted(ttt.actions(board)))
+
+
+def alphabeta_player():
+    return lambda board, stats: ttt.minimax_alphabeta(board, stats)
+
+
+def negamax_player():
+    return lambda board, stats: ttt.negamax(board, stats)
+
+
+def table_player():
+    return lambda board, stats: ttt.minimax(board, stats=stats)
+
+
+def bitboard_player():
+    return lambda board, stats: bitboard.minimax(bitboard.from_board(board),
+                                                 stats)
+
+
+def solved_player():
+    global table
+    if table is None:
+        table = solved.load()
+    return lambda board, stats: solved.minimax(board, table)
+
+
+def mnk_player():
+    game = mnk.Game(3, 3, 3)
+    return lambda board, stats: game.minimax(board, BUDGET, stats=stats)
+
+
+def mcts_player():
+    player = mcts.MCTS(mnk.Game(3, 3, 3))
+    return lambda board, stats: player.move(board, playouts=PLAYOUTS,
+                                            stats=stats)
+
+
+# Functions that return a new player for a game, which is a function of
+# the board and a stats dictionary that returns a move
+ENGINES = {
+    "random": random_player,
+    "alphabeta": alphabeta_player,
+    "negamax": negamax_player,
+    "table": table_player,
+    "bitboard": bitboard_player,
+    "solved": solved_player,
+    "mnk": mnk_player,
+    "mcts": mcts_player
+}
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    engines = sys.argv[3:] or list(ENGINES)
+    for engine in engines:
+        if engine not in ENGINES:
+            sys.exit(f"Unknown engine {engine}, "
+                     f"choose from {', '.join(ENGINES)}")
+
+    start = time.perf_counter()
+    results = tournament(engines, games, workers)
+    print(f"Played {sum(len(r) for r in results.values())} games in "
+          f"{time.perf_counter() - start:.1f}s\n")
+    print(report(results))
+
+
+def play(x, o, seed, opening=OPENING):
+    """
+    Returns the winner of a game between engines `x` and `o`, or None for a
+    tie, and a list of `(engine, seconds, stats)` for each move searched.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)
+    players = {ttt.X: (x, ENGINES[x]()), ttt.O: (o, ENGINES[o]())}
+    board = ttt.initial_state()
+    moves = []
+    for _ in range(opening):
+        board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+    while not ttt.terminal(board):
+        name, player = players[ttt.player(board)]
+        stats = dict()
+        begin = time.perf_counter()
+        move = player(board, stats)
+        seconds = time.perf_counter() - begin
+        moves.append((name, seconds, stats))
+        board = ttt.result(board, move)
+    return ttt.winner(board), moves
+
+
+def play_task(task):
+    return task, play(*task)
+
+
+def tournament(engines, games, workers=1):
+    """
+    Plays `games` games for every ordered pair of `engines`, returning a
+    dictionary from `(x, o)` to the list of results of `play`.
+    """
+    tasks = [(x, o, seed) for x in engines for o in engines
+             for seed in range(games)]
+    results = {(x, o): [] for x in engines for o in engines}
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = executor.map(play_task, tasks, chunksize=16)
+            for (x, o, seed), outcome in outcomes:
+                results[x, o].append(outcome)
+    else:
+        for task in tasks:
+            results[task[0], task[1]].append(play(*task))
+    return results
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of `values`, by the nearest rank.
+    """
+    values = sorted(values)
+    rank = max(0, min(len(values) - 1, math.ceil(p / 100 * len(values)) - 1))
+    return values[rank]
+
+
+def summary(results):
+    """
+    Returns a dictionary from engine to the totals of its moves in
+    `results`: "moves", "seconds", "nodes", "cutoffs", "depth" and the
+    list of "latencies".
+    """
+    totals = dict()
+    for games in results.values():
+        for _, moves in games:
+            for engine, seconds, stats in moves:
+                total = totals.setdefault(engine, {
+                    "moves": 0, "seconds": 0.0, "nodes": 0, "cutoffs": 0,
+                    "depth": 0, "latencies": []
+                })
+                total["moves"] += 1
+                total["seconds"] += seconds
+                total["nodes"] += stats.get("nodes",
+                                            stats.get("playouts", 0))
+                total["cutoffs"] += stats.get("cutoffs", 0)
+                total["depth"] = max(total["depth"], stats.get("depth", 0))
+                total["latencies"].append(seconds)
+    return totals
+
+
+def report(results):
+    """
+    Returns the engine and outcome tables of `results` as text.
+    """
+    lines = [
+        f"{'engine':<10} {'moves':>6} {'nodes/s':>11} {'nodes/move':>10} "
+        f"{'cutoffs/move':>12} {'depth':>5} {'p50 ms':>8} {'p90 ms':>8} "
+        f"{'p99 ms':>8}"
+    ]
+    for engine, total in summary(results).items():
+        rate = total["nodes"] / total["seconds"] if total["seconds"] else 0
+        p50, p90, p99 = (percentile(total["latencies"], p) * 1000
+                         for p in [50, 90, 99])
+        lines.append(
+            f"{engine:<10} {total['moves']:>6} {rate:>11,.0f} "
+            f"{total['nodes'] / total['moves']:>10.1f} "
+            f"{total['cutoffs'] / total['moves']:>12.1f} "
+            f"{total['depth']:>5} {p50:>8.2f} {p90:>8.2f} {p99:>8.2f}"
+        )
+
+    lines.append("")
+    lines.append(f"{'X':<10} {'O':<10} {'X wins':>7} {'O wins':>7} "
+                 f"{'ties':>7}")
+    for (x, o), games in results.items():
+        winners = [winner for winner, _ in games]
+        lines.append(f"{x:<10} {o:<10} {winners.count(ttt.X):>7} "
+                     f"{winners.count(ttt.O):>7} {winners.count(None):>7}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Tic Tac Toe solved once, so the computer's moves are looked up, not searched.
+
+The 3 x 3 game has only 765 positions that differ by more than a rotation
+or reflection. `build` solves all of them and stores each as one byte,
+at the index of its canonical key from `tictactoe.canonical`: the game
+value for X plus one in bits 4 and 5, and the best move in canonical
+coordinates, numbered 3 * i + j, in the low 4 bits. Unreachable keys are
+`UNKNOWN`. The table is 3 ^ 9 bytes, so a lookup is a single index.
+
+Run `python solved.py build` to write the table to `solved.bin`, and
+`python solved.py verify` to check it against `tictactoe.minimax` on
+every reachable position.
+"""
+
+import os
+import sys
+
+import tictactoe as ttt
+
+TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved.bin")
+SIZE = 3 ** 9
+
+UNKNOWN = 0xFF
+NO_MOVE = 0x0F
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in ["build", "verify"]:
+        sys.exit("Usage: python solved.py [build|verify]")
+    if sys.argv[1] == "build":
+        table = build()
+        with open(TABLE, "wb") as f:
+            f.write(table)
+        known = sum(entry != UNKNOWN for entry in table)
+        print(f"Wrote {known} positions in {len(table)} bytes to {TABLE}")
+    else:
+        table = load()
+        mismatches = verify(table)
+        for board in mismatches:
+            print(f"Mismatch: {board}")
+        if mismatches:
+            sys.exit(f"{len(mismatches)} positions disagree with minimax")
+        print("Every reachable position agrees with minimax")
+
+
+def build():
+    """
+    Returns the table of every position reachable from the initial state.
+    """
+    table = bytearray([UNKNOWN]) * SIZE
+
+    def solve(board):
+        """
+        Adds the board to the table if needed, returning its value for X.
+        """
+        key, symmetry = ttt.canonical(board)
+        if table[key] != UNKNOWN:
+            return (table[key] >> 4) - 1
+        if ttt.terminal(board):
+            v, move = ttt.utility(board), None
+        else:
+            sign = 1 if ttt.player(board) == ttt.X else -1
+            v, move = None, None
+            for action in sorted(ttt.actions(board)):
+                v2 = solve(ttt.result(board, action))
+                if v is None or v2 * sign > v * sign:
+                    v, move = v2, action
+            move = ttt.transform(move, ttt.INVERSES[symmetry])
+        cell = NO_MOVE if move is None else 3 * move[0] + move[1]
+        table[key] = (v + 1) << 4 | cell
+        return v
+
+    solve(ttt.initial_state())
+    return bytes(table)
+
+
+def load(path=TABLE):
+    """
+    Returns the table written to `path` by `python solved.py build`, or
+    builds it if there is none.
+    """
+    if not os.path.exists(path):
+        return build()
+    with open(path, "rb") as f:
+        table = f.read()
+    if len(table) != SIZE:
+        raise ValueError(f"{path} is not a solved game table")
+    return table
+
+
+def lookup(board, table):
+    """
+    Returns the game value of the board for X, and the optimal action for
+    the current player, or None if the game is over.
+    """
+    key, symmetry = ttt.canonical(board)
+    entry = table[key]
+    if entry == UNKNOWN:
+        raise ValueError("board is not reachable in a game")
+    cell = entry & NO_MOVE
+    move = None if cell == NO_MOVE else ttt.transform(divmod(cell, 3), symmetry)
+    return (entry >> 4) - 1, move
+
+
+def minimax(board, table):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    return lookup(board, table)[1]
+
+
+def verify(table):
+    """
+    Returns every reachable board whose value in the table differs from
+    the outcome of `tictactoe.minimax` playing both sides, or whose move
+    in the table leads to a different outcome.
+    """
+    search = dict()
+
+    def outcome(board):
+        while not ttt.terminal(board):
+            board = ttt.result(board, ttt.minimax(board, search))
+        return ttt.utility(board)
+
+    mismatches = []
+    seen, frontier = set(), [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        if str(board) in seen:
+            continue
+        seen.add(str(board))
+        v, move = lookup(board, table)
+        if ttt.terminal(board):
+            if move is not None or v != ttt.utility(board):
+                mismatches.append(board)
+            continue
+        if v != outcome(board) or v != outcome(ttt.result(board, move)):
+            mismatches.append(board)
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return mismatches
+
+
+if __name__ == "__main__":
+    main()
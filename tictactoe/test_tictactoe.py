@@ -0,0 +1,286 @@
+import os
+import tempfile
+import time
+
+import background
+import bitboard
+import mcts
+import mnk
+import selfplay
+import solved
+import tictactoe as ttt
+
+
+VALUES = dict()
+
+
+def value(board):
+    """The game value of the board for X, by exhaustive search"""
+    key = str(board)
+    if key not in VALUES:
+        if ttt.terminal(board):
+            VALUES[key] = ttt.utility(board)
+        else:
+            values = [value(ttt.result(board, action))
+                      for action in ttt.actions(board)]
+            VALUES[key] = (max(values) if ttt.player(board) == ttt.X
+                           else min(values))
+    return VALUES[key]
+
+
+def positions():
+    """Every reachable position where the game is not over"""
+    seen, frontier = dict(), [ttt.initial_state()]
+    while frontier:
+        board = frontier.pop()
+        if ttt.terminal(board) or str(board) in seen:
+            continue
+        seen[str(board)] = board
+        for action in ttt.actions(board):
+            frontier.append(ttt.result(board, action))
+    return list(seen.values())
+
+
+def optimal(board, action):
+    return value(ttt.result(board, action)) == value(board)
+
+
+def test_minimax_table():
+    """minimax with a shared transposition table plays optimally everywhere"""
+    table = dict()
+    for board in positions():
+        assert optimal(board, ttt.minimax(board, table))
+        assert optimal(board, ttt.minimax_alphabeta(board))
+
+
+def test_negamax():
+    """negamax plays optimally and searches less than plain alpha-beta"""
+    for board in positions():
+        assert optimal(board, ttt.negamax(board))
+    openings = [ttt.initial_state()] + [
+        ttt.result(ttt.initial_state(), action)
+        for action in ttt.actions(ttt.initial_state())
+    ]
+    for board in openings:
+        plain, ordered = dict(), dict()
+        ttt.minimax_alphabeta(board, plain)
+        ttt.negamax(board, ordered)
+        assert ordered["nodes"] < plain["nodes"]
+
+
+def test_canonical():
+    """Symmetric boards share a key, and moves map back to the same cell"""
+    board = [[ttt.X, ttt.EMPTY, ttt.EMPTY],
+             [ttt.EMPTY, ttt.O, ttt.EMPTY],
+             [ttt.EMPTY, ttt.EMPTY, ttt.EMPTY]]
+    key, symmetry = ttt.canonical(board)
+    for permutation in ttt.SYMMETRIES:
+        cells = [board[k // 3][k % 3] for k in permutation]
+        image = [cells[0:3], cells[3:6], cells[6:9]]
+        assert ttt.canonical(image)[0] == key
+    for i in range(3):
+        for j in range(3):
+            canonical_move = ttt.transform((i, j), ttt.INVERSES[symmetry])
+            assert ttt.transform(canonical_move, symmetry) == (i, j)
+
+
+def test_table_reduces_nodes():
+    """The table searches fewer positions than plain alpha-beta"""
+    plain, stats = dict(), dict()
+    ttt.minimax_alphabeta(ttt.initial_state(), plain)
+    ttt.minimax(ttt.initial_state(), stats=stats)
+    assert stats["nodes"] < plain["nodes"]
+    assert 0 < stats["hits"] <= stats["probes"]
+
+
+def test_bitboard():
+    """The bitboard engine agrees with tictactoe.py on every position"""
+    for board in positions():
+        bits = bitboard.from_board(board)
+        assert bitboard.to_board(bits) == board
+        assert bitboard.player(bits) == ttt.player(board)
+        assert bitboard.actions(bits) == ttt.actions(board)
+        for action in ttt.actions(board):
+            after = ttt.result(board, action)
+            assert bitboard.result(bits, action) == bitboard.from_board(after)
+            assert bitboard.winner(bitboard.from_board(after)) == ttt.winner(after)
+            assert bitboard.utility(bitboard.from_board(after)) == ttt.utility(after)
+            assert bitboard.terminal(bitboard.from_board(after)) == ttt.terminal(after)
+        assert optimal(board, bitboard.minimax(bits))
+
+
+def test_mnk_3x3():
+    """The 3 x 3 m,n,k game matches tictactoe.py and plays optimally"""
+    game = mnk.Game(3, 3, 3)
+    assert game.initial_state() == ttt.initial_state()
+    for board in positions()[::20]:
+        assert game.player(board) == ttt.player(board)
+        assert game.actions(board) == ttt.actions(board)
+        for action in ttt.actions(board):
+            after = ttt.result(board, action)
+            assert game.result(board, action) == after
+            assert game.winner(after) == ttt.winner(after)
+            assert game.terminal(after) == ttt.terminal(after)
+        assert optimal(board, game.minimax(board, budget=60))
+
+
+def test_mnk_budget():
+    """Bigger boards take the win in front of them and keep to the budget"""
+    game = mnk.Game(5, 5, 4)
+    board = game.initial_state()
+    for action in [(2, 0), (0, 0), (2, 1), (0, 4), (2, 2), (4, 4)]:
+        board = game.result(board, action)
+    assert game.minimax(board, budget=1) == (2, 3)
+
+    game = mnk.Game(7, 7, 5)
+    stats = dict()
+    start = time.perf_counter()
+    move = game.minimax(game.initial_state(), budget=0.2, stats=stats)
+    assert time.perf_counter() - start < 1
+    assert move in game.actions(game.initial_state())
+    assert stats["depth"] >= 1
+
+    # Heuristic scores stay below the score of the slowest win
+    game = mnk.Game(1, 12, 11)
+    board = [[ttt.EMPTY] + [ttt.X] * 10 + [ttt.EMPTY]]
+    bound = mnk.WIN - 12 - 1
+    assert game.evaluate(board, ttt.X) == bound
+    assert game.evaluate(board, ttt.O) == -bound
+
+    # The search stops within a few nodes of the budget, however long each
+    # node takes
+    for m, budget in [(15, 0.3), (19, 0.2)]:
+        game = mnk.Game(m, m, 5)
+        board = game.result(game.initial_state(), (m // 2, m // 2))
+        start = time.perf_counter()
+        move = game.minimax(board, budget=budget)
+        assert time.perf_counter() - start < budget + 0.05
+        assert move in game.actions(board)
+
+
+def test_solved_table():
+    """The solved table holds the value and an optimal move everywhere"""
+    table = solved.build()
+    assert len(table) == solved.SIZE
+    for board in positions():
+        v, move = solved.lookup(board, table)
+        assert v == value(board)
+        assert optimal(board, move)
+    assert solved.verify(table) == []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "solved.bin")
+        with open(path, "wb") as f:
+            f.write(table)
+        assert solved.load(path) == table
+
+
+def test_mcts():
+    """MCTS takes wins, blocks losses, reuses its tree and uses workers"""
+    game = mnk.Game(3, 3, 3)
+    win = [[ttt.X, ttt.X, ttt.EMPTY],
+           [ttt.O, ttt.O, ttt.EMPTY],
+           [ttt.EMPTY, ttt.EMPTY, ttt.EMPTY]]
+    block = [[ttt.X, ttt.X, ttt.EMPTY],
+             [ttt.O, ttt.EMPTY, ttt.EMPTY],
+             [ttt.EMPTY, ttt.EMPTY, ttt.EMPTY]]
+    for heuristic in [False, True]:
+        player = mcts.MCTS(game, heuristic=heuristic, seed=0)
+        assert player.move(win, playouts=2000) == (0, 2)
+        assert player.move(block, playouts=2000) == (0, 2)
+
+    player = mcts.MCTS(game, seed=0)
+    board = game.initial_state()
+    board = game.result(board, player.move(board, playouts=2000))
+    board = game.result(board, ttt.minimax(board))
+    stats = dict()
+    player.move(board, playouts=100, stats=stats)
+    assert stats["playouts"] == 100 and stats["reused"] > 0
+
+    # Without any rollout, the move is still legal
+    for budget, playouts in [(0, None), (1, 0)]:
+        player = mcts.MCTS(game, seed=0)
+        assert (player.move(block, budget, playouts)
+                in game.actions(block))
+
+    player = mcts.MCTS(mnk.Game(4, 4, 3), workers=2, batch=16, seed=0)
+    try:
+        stats = dict()
+        move = player.move(player.game.initial_state(), playouts=64,
+                           stats=stats)
+        assert move in player.game.actions(player.game.initial_state())
+        assert player.root.visits == 64
+    finally:
+        player.close()
+
+
+def test_background_search():
+    """Background searches report progress, finish, and stop when cancelled"""
+    game = mnk.Game(3, 3, 3)
+    search = background.Search(game.minimax, game.initial_state())
+    assert optimal(ttt.initial_state(), search.result(timeout=30))
+    assert search.progress["depth"] == 9
+
+    game = mnk.Game(7, 7, 5)
+    search = background.Search(
+        lambda board, stats, cancel: game.minimax(board, 60, stats=stats,
+                                                  cancel=cancel),
+        game.initial_state()
+    )
+    while not search.progress.get("nodes"):
+        time.sleep(0.01)
+    search.cancel()
+    assert search.result(timeout=5) in game.actions(game.initial_state())
+
+
+def test_search_stats():
+    """Every search reports its nodes, cutoffs and depth"""
+    for search in [ttt.minimax_alphabeta,
+                   lambda board, stats: ttt.minimax(board, stats=stats),
+                   ttt.negamax,
+                   lambda board, stats: bitboard.minimax(
+                       bitboard.from_board(board), stats),
+                   lambda board, stats: mnk.Game().minimax(board, stats=stats)]:
+        stats = dict()
+        search(ttt.initial_state(), stats)
+        assert stats["nodes"] > stats["cutoffs"] > 0
+        assert stats["depth"] == 9 or stats["depth"] == 8
+
+
+def test_selfplay():
+    """Self-play is repeatable and the report covers every pairing"""
+    engines = ["random", "solved", "bitboard"]
+    results = selfplay.tournament(engines, 3)
+    assert len(results) == 9
+    assert all(len(games) == 3 for games in results.values())
+    again = selfplay.tournament(engines, 3, workers=2)
+    assert ({pair: [winner for winner, _ in games]
+             for pair, games in results.items()} ==
+            {pair: [winner for winner, _ in games]
+             for pair, games in again.items()})
+    totals = selfplay.summary(results)
+    assert totals["bitboard"]["nodes"] > 0
+    assert totals["solved"]["moves"] == len(totals["solved"]["latencies"])
+    assert selfplay.percentile([3, 1, 2, 4], 50) == 2
+    assert selfplay.percentile([5, 4, 3, 2, 1], 50) == 3
+    assert selfplay.percentile(range(1, 11), 91) == 10
+    assert "bitboard   solved" in selfplay.report(results)
+
+
+def main():
+    test_minimax_table()
+    test_negamax()
+    test_canonical()
+    test_table_reduces_nodes()
+    test_bitboard()
+    test_mnk_3x3()
+    test_mnk_budget()
+    test_solved_table()
+    test_mcts()
+    test_background_search()
+    test_search_stats()
+    test_selfplay()
+    print("tictactoe tests passed")
+
+
+if __name__ == "__main__":
+    main()
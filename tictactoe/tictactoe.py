@@ -163,14 +163,24 @@ def minimax_original(board):
     return act
 
 
-def minimax(board):
+def minimax_alphabeta(board, stats=None):
     """
     Returns the optimal action for the current player on the board.
     This solution applies alpha-beta-search to minimax algorithm
+
+    If `stats` is a dictionary, the number of positions searched is added
+    to its "nodes" entry, the number of alpha-beta cutoffs to "cutoffs",
+    and "depth" is raised to the most moves searched ahead.
     """
     actor = player(board)
-
-    def MaxValue(b, alpha, beta):
+    if stats is None:
+        stats = dict()
+    for key in ["nodes", "cutoffs", "depth"]:
+        stats.setdefault(key, 0)
+
+    def MaxValue(b, alpha, beta, ply):
+        stats["nodes"] += 1
+        stats["depth"] = max(stats["depth"], ply)
         if terminal(b):
             ut = utility(b)
             if actor == O:
@@ -179,15 +189,18 @@ def minimax(board):
 
         v = float('-inf')
         for a in actions(b):
-            v2, a2 = MinValue(result(b, a), alpha, beta)
+            v2, a2 = MinValue(result(b, a), alpha, beta, ply + 1)
             if v2 > v:
                 v, move = v2, a
                 alpha = max(alpha, v)
             if v >= beta:
+                stats["cutoffs"] += 1
                 return v, move
         return v, move
 
-    def MinValue(b, alpha, beta):
+    def MinValue(b, alpha, beta, ply):
+        stats["nodes"] += 1
+        stats["depth"] = max(stats["depth"], ply)
         if terminal(b):
             ut = utility(b)
             if actor == O:
@@ -196,15 +209,255 @@ def minimax(board):
 
         v = float('inf')
         for a in actions(b):
-            v2, a2 = MaxValue(result(b, a), alpha, beta)
+            v2, a2 = MaxValue(result(b, a), alpha, beta, ply + 1)
             if v2 < v:
                 v, move = v2, a
                 beta = min(beta, v)
             if v <= alpha:
+                stats["cutoffs"] += 1
                 return v, move
         return v, move
 
+    val, act = MaxValue(board, float('-inf'), float('inf'), 0)
+    return act
 
-    val, act = MaxValue(board, float('-inf'), float('inf'))
-    # print(val, act)
-    return act
\ No newline at end of file
+
+def minimax(board, table=None, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
+
+    This is alpha-beta search with a transposition table, so a position
+    reached by different move orders, or a rotation or reflection of one
+    already searched, is looked up instead of searched again. Pass the same
+    dictionary as `table` to keep what was learned between moves.
+
+    If `stats` is a dictionary, the number of positions searched is added
+    to its "nodes" entry, the number of alpha-beta cutoffs to "cutoffs",
+    table lookups to "probes", lookups that found the position to "hits",
+    and hits that ended the search of a position to "table cutoffs".
+    "depth" is raised to the most moves searched ahead.
+    """
+    actor = player(board)
+    if table is None:
+        table = dict()
+    if stats is None:
+        stats = dict()
+    for key in ["nodes", "cutoffs", "depth", "probes", "hits",
+                "table cutoffs"]:
+        stats.setdefault(key, 0)
+
+    def search(b, alpha, beta, maximizing, ply):
+        stats["nodes"] += 1
+        stats["depth"] = max(stats["depth"], ply)
+        if terminal(b):
+            ut = utility(b)
+            if actor == O:
+                ut = -ut
+            return ut, None
+
+        # Table values are for the player to move, which is the actor
+        # at maximizing positions and the opponent at the others
+        sign = 1 if maximizing else -1
+        key, symmetry = canonical(b)
+        stats["probes"] += 1
+        entry = table.get(key)
+        first = None
+        if entry is not None:
+            stats["hits"] += 1
+            value, bound, move = entry
+            value *= sign
+            if sign < 0 and bound != EXACT:
+                bound = LOWER if bound == UPPER else UPPER
+            first = transform(move, symmetry)
+            if (bound == EXACT or (bound == LOWER and value >= beta) or
+                    (bound == UPPER and value <= alpha)):
+                stats["table cutoffs"] += 1
+                return value, first
+
+        # Search the best move found before first
+        moves = sorted(actions(b), key=lambda a: a != first)
+        start_alpha, start_beta = alpha, beta
+        v = float('-inf') if maximizing else float('inf')
+        for a in moves:
+            v2, a2 = search(result(b, a), alpha, beta, not maximizing,
+                            ply + 1)
+            if maximizing and v2 > v:
+                v, move = v2, a
+                alpha = max(alpha, v)
+            elif not maximizing and v2 < v:
+                v, move = v2, a
+                beta = min(beta, v)
+            if alpha >= beta:
+                stats["cutoffs"] += 1
+                break
+
+        if v <= start_alpha:
+            bound = UPPER
+        elif v >= start_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        if sign < 0 and bound != EXACT:
+            bound = LOWER if bound == UPPER else UPPER
+        table[key] = (v * sign, bound, transform(move, INVERSES[symmetry]))
+        return v, move
+
+    val, act = search(board, float('-inf'), float('inf'), True, 0)
+    return act
+
+
+def negamax(board, stats=None):
+    """
+    Returns the optimal action for the current player on the board.
+
+    This is alpha-beta search in negamax form: every position is scored for
+    the player to move, so one function serves both players. Moves are
+    tried in the order most likely to cause a cutoff: a killer move that
+    caused one at the same depth before, then by the history of cutoffs
+    each move has caused, then the center, the corners and the edges. The
+    first move is searched with the full window, and the rest with a null
+    window that only proves them no better, re-searching any that are
+    (principal variation search).
+
+    If `stats` is a dictionary, the number of positions searched is added
+    to its "nodes" entry, the number of alpha-beta cutoffs to "cutoffs",
+    and the number of re-searches to "researches", and "depth" is raised
+    to the most moves searched ahead.
+    """
+    if stats is None:
+        stats = dict()
+    for key in ["nodes", "cutoffs", "depth", "researches"]:
+        stats.setdefault(key, 0)
+    killers = dict()
+    history = dict()
+
+    def search(b, alpha, beta, ply):
+        stats["nodes"] += 1
+        stats["depth"] = max(stats["depth"], ply)
+        if terminal(b):
+            ut = utility(b)
+            return (ut if player(b) == X else -ut), None
+
+        killer = killers.get(ply, [])
+        moves = sorted(actions(b), key=lambda a: (
+            a not in killer, -history.get(a, 0), CELL_RANKS[a]
+        ))
+        v, move = float('-inf'), None
+        for a in moves:
+            child = result(b, a)
+            if move is None:
+                v2 = -search(child, -beta, -alpha, ply + 1)[0]
+            else:
+                v2 = -search(child, -alpha - 1, -alpha, ply + 1)[0]
+                if alpha < v2 < beta:
+                    stats["researches"] += 1
+                    v2 = -search(child, -beta, -v2, ply + 1)[0]
+            if v2 > v:
+                v, move = v2, a
+                alpha = max(alpha, v)
+            if alpha >= beta:
+                stats["cutoffs"] += 1
+                if a not in killer:
+                    killers[ply] = [a] + killer[:1]
+                history[a] = history.get(a, 0) + len(moves) ** 2
+                break
+        return v, move
+
+    val, act = search(board, float('-inf'), float('inf'), 0)
+    return act
+
+
+def canonical(board):
+    """
+    Returns the smallest key of the board under its 8 rotations and
+    reflections, and the symmetry that maps the board to it.
+
+    A key is the board read in base 3, with EMPTY, X and O as digits
+    0, 1 and 2.
+    """
+    cells = [CELL_DIGITS[board[i][j]] for i in range(3) for j in range(3)]
+    best = None
+    for symmetry, permutation in enumerate(SYMMETRIES):
+        key = 0
+        for k in permutation:
+            key = key * 3 + cells[k]
+        if best is None or key < best:
+            best, found = key, symmetry
+    return best, found
+
+
+def transform(action, symmetry):
+    """
+    Returns the cell that `action` on a canonical board (i, j) corresponds
+    to on the board it was made from by `symmetry`.
+    """
+    if action is None:
+        return None
+    i, j = action
+    k = SYMMETRIES[symmetry][3 * i + j]
+    return k // 3, k % 3
+
+
+def symmetries():
+    """
+    Returns the 8 symmetries of the board as permutations of its cells,
+    numbered 3 * i + j, where cell k of the transformed board is cell
+    `permutation[k]` of the original.
+    """
+    cells = [(i, j) for i in range(3) for j in range(3)]
+    permutations = []
+    for reflect in [False, True]:
+        for turns in range(4):
+            permutation = []
+            for i, j in cells:
+                if reflect:
+                    j = 2 - j
+                for _ in range(turns):
+                    i, j = j, 2 - i
+                permutation.append(3 * i + j)
+            permutations.append(tuple(permutation))
+    return permutations
+
+
+# Bound types of transposition table values
+EXACT, LOWER, UPPER = 0, 1, 2
+
+CELL_DIGITS = {EMPTY: 0, X: 1, O: 2}
+
+# Order in which negamax tries moves when nothing else tells them apart:
+# the center, then the corners, then the edges
+CELL_RANKS = {(i, j): 0 if i == j == 1 else 1 if i != 1 and j != 1 else 2
+              for i in range(3) for j in range(3)}
+SYMMETRIES = symmetries()
+INVERSES = [
+    SYMMETRIES.index(tuple(sorted(range(9), key=lambda k: p[k])))
+    for p in SYMMETRIES
+]
+
+
+def main():
+    """
+    Reports the positions searched from each opening position by plain
+    alpha-beta search, by negamax with move ordering, and with the
+    transposition table.
+    """
+    print(f"{'opening':<10} {'alpha-beta':>10} {'negamax':>8} "
+          f"{'reduction':>10} {'table':>8} {'hit rate':>9} {'reduction':>10}")
+    openings = [(None, initial_state())] + [
+        (action, result(initial_state(), action))
+        for action in sorted(actions(initial_state()))
+    ]
+    for action, board in openings:
+        plain, ordered, stats = dict(), dict(), dict()
+        minimax_alphabeta(board, plain)
+        negamax(board, ordered)
+        minimax(board, stats=stats)
+        print(f"{str(action or 'empty'):<10} {plain['nodes']:>10} "
+              f"{ordered['nodes']:>8} "
+              f"{1 - ordered['nodes'] / plain['nodes']:>10.1%} "
+              f"{stats['nodes']:>8} {stats['hits'] / stats['probes']:>9.1%} "
+              f"{1 - stats['nodes'] / plain['nodes']:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()